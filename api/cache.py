@@ -0,0 +1,294 @@
+"""
+Caches shared by the serverless functions.
+
+Everything here lives in module globals, so it survives across invocations
+on a warm instance and starts empty on a cold one. DiskCache is the
+optional second level for data worth sharing between workers on a host,
+and SnapshotFile serves read-only data built ahead of time and shipped
+with the deployment, so even a cold instance has it.
+"""
+
+import json
+import mmap
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Bounded LRU cache with per-entry expiry and hit/miss counters.
+
+    Negative entries (lookups that found nothing) are stored with their own,
+    usually shorter, TTL so a transient miss doesn't stick around as long as
+    a real answer. Expired entries stay until they're replaced or evicted,
+    so get_stale() can still serve them when the source is unavailable.
+    Safe to share between threads.
+    """
+
+    def __init__(self, maxsize, ttl, negative_ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self._data = OrderedDict()  # key -> (expires_at, negative, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if absent/expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            if entry[1]:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return entry[2]
+
+    def get_stale(self, key, default=None):
+        """Return the value for key even if it has expired; not counted in the stats."""
+        with self._lock:
+            entry = self._data.get(key)
+            return default if entry is None else entry[2]
+
+    def set(self, key, value, negative=False, ttl=None):
+        """Store value under key, evicting the least recently used entry if full.
+
+        ttl, if given, replaces the cache's TTL for this entry (e.g. the time
+        left on a copy read from somewhere else).
+        """
+        if self.maxsize <= 0:
+            return
+        if ttl is None:
+            ttl = self.negative_ttl if negative else self.ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, negative, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.negative_hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+class DiskCache:
+    """JSON values in a SQLite file, shared by every process that opens it.
+
+    Best-effort: any database error is treated as a miss (or a skipped
+    write) so a locked or unwritable file never fails a request. Keys live
+    under a namespace, so bumping the namespace (e.g. with a parser version)
+    orphans old entries instead of serving them. With max_entries set, each
+    write drops the least recently written entries beyond that count.
+    """
+
+    def __init__(self, path, namespace, max_entries=None):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "updated REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        try:
+            row = self._conn().execute(
+                "SELECT value FROM entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        except sqlite3.Error:
+            return default
+        return default if row is None else json.loads(row[0])
+
+    def set(self, key, value):
+        self.set_many([(key, value)])
+
+    def set_many(self, items):
+        """Store (key, value) pairs in one transaction."""
+        now = time.time()
+        rows = [(self.namespace, key, json.dumps(value), now) for key, value in items]
+        if not rows:
+            return
+        try:
+            conn = self._conn()
+            conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", rows)
+            if self.max_entries is not None:
+                conn.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key NOT IN ("
+                    "SELECT key FROM entries WHERE namespace = ? ORDER BY updated DESC LIMIT ?)",
+                    (self.namespace, self.namespace, self.max_entries),
+                )
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        """Block until the leader lands; return its result or raise its exception."""
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one.
+
+    The first caller for a key runs fn(); callers that arrive while it's
+    running wait and get its result (or its exception) instead of running
+    their own. Nothing is kept once the call finishes; pair it with a cache
+    for that. Safe to share between threads.
+
+    Work that can't be wrapped in one function call (e.g. a generator that
+    streams as it goes) uses claim() and land() directly.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def claim(self, key):
+        """Return (flight, leader). The leader must land() the flight; others flight.wait()."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.calls += 1
+            else:
+                self.shared += 1
+        return flight, leader
+
+    def land(self, key, flight, result=None, error=None):
+        """Finish a claimed flight and wake its waiters."""
+        flight.result = result
+        flight.error = error
+        with self._lock:
+            del self._flights[key]
+        flight.done.set()
+
+    def do(self, key, fn):
+        flight, leader = self.claim(key)
+        if not leader:
+            return flight.wait()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self.land(key, flight, error=e)
+            raise
+        self.land(key, flight, result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "shared": self.shared, "in_flight": len(self._flights)}
+
+
+class SnapshotFile:
+    """Read-only lookups in a sorted, tab-separated file, without loading it.
+
+    Each line is `key<TAB>field<TAB>field...`, sorted by the UTF-8 bytes of
+    the key with no duplicates (write_snapshot produces this). get() binary
+    searches the memory-mapped file, so opening costs nothing and the pages
+    are shared with the OS cache. A missing or empty file is an empty
+    snapshot.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._map = None
+        self._lock = threading.Lock()
+
+    def _mapped(self):
+        if self._map is None:
+            with self._lock:
+                if self._map is None:
+                    try:
+                        with open(self.path, "rb") as f:
+                            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    except (OSError, ValueError):  # missing, or empty (can't map 0 bytes)
+                        self._map = b""
+        return self._map
+
+    def get(self, key):
+        """Return the fields stored for key as a list of str, or None."""
+        data = self._mapped()
+        target = key.encode("utf-8")
+        lo, hi = 0, len(data)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = data.rfind(b"\n", 0, mid) + 1
+            end = data.find(b"\n", start)
+            if end == -1:
+                end = len(data)
+            tab = data.find(b"\t", start, end)
+            line_key = data[start:tab if tab != -1 else end]
+            if line_key < target:
+                lo = end + 1
+            elif line_key > target:
+                hi = start
+            else:
+                return [] if tab == -1 else data[tab + 1:end].decode("utf-8").split("\t")
+        return None
+
+
+def write_snapshot(path, rows):
+    """Write {key: [field, ...]} as a SnapshotFile; tabs and newlines become spaces."""
+    def clean(text):
+        return " ".join(str(text).split())
+
+    cleaned = {clean(key).encode("utf-8"): fields for key, fields in rows.items() if clean(key)}
+    lines = [
+        b"\t".join([key, *(clean(field).encode("utf-8") for field in cleaned[key])])
+        for key in sorted(cleaned)
+    ]
+    with open(path, "wb") as f:
+        f.write(b"\n".join(lines) + (b"\n" if lines else b""))
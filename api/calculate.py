@@ -2,15 +2,31 @@
 Vercel Python serverless function for recipe calorie calculation.
 
 POST /api/calculate
-Body: { "url": "https://example.com/recipe" }
+Body: { "url": "https://example.com/recipe", "stream": false, "debug": false }
 Returns: JSON with recipe title, servings, calories, and ingredient breakdown.
+
+Every response carries a Server-Timing header with per-stage durations
+(fetch, scrape, fallback, parse, ingredient, usda). With "debug": true the
+individual spans are also returned in the payload's debug field.
+
+With "stream": true the response is NDJSON instead, one event per line as
+the work progresses (see recipe_logic.iter_recipe_calories); a recipe
+calculated recently, or cached for unchanged HTML, is replayed at once:
+  {"type": "recipe", "title", "servings", "ingredient_count"}
+  {"type": "ingredient", "index", "ingredient": {...}}   once per ingredient
+  {"type": "totals", "total_kcal", "per_serving"}
+A failure before the recipe event is an ordinary JSON error response; one
+after it ends the stream with {"type": "error", "error", "debug"}. A stream's
+Server-Timing header only covers the stages before the recipe event; the
+totals event has the full timing in its debug field when requested.
 """
 
 import json
 import os
 import traceback
 from http.server import BaseHTTPRequestHandler
-import requests
+
+from api.records import dumps
 
 # Point NLTK to bundled data before importing recipe_logic
 # (ingredient-parser-nlp needs averaged_perceptron_tagger_eng)
@@ -20,23 +36,63 @@ os.environ["NLTK_DATA"] = str(pathlib.Path(__file__).parent / "nltk_data")
 # Defer the import so we can catch and report errors
 _import_error = None
 try:
-    from api.recipe_logic import calculate_recipe
+    from api.recipe_logic import calculate_recipe, stream_recipe_calories
+    from api.scraping import error_response
+    from api.timing import attach_debug, collect
 except Exception:
     _import_error = traceback.format_exc()
     calculate_recipe = None
 
 USDA_API_KEY = os.environ.get("USDA_API_KEY")
+USDA_LOCAL_DB = os.environ.get("USDA_LOCAL_DB")
+GENERIC_ERROR = "Something went wrong while analyzing this recipe. Please try again."
 
 
 class handler(BaseHTTPRequestHandler):
-    def _send_json(self, status, data):
+    def _send_headers(self, status, content_type, timings=None):
         self.send_response(status)
-        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Type", content_type)
+        if timings is not None:
+            self.send_header("Server-Timing", timings.header())
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
         self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        if content_type == "application/x-ndjson":
+            self.send_header("Cache-Control", "no-cache")
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode("utf-8"))
+
+    def _send_json(self, status, data, timings=None):
+        self._send_headers(status, "application/json", timings)
+        self.wfile.write(dumps(data))
+
+    def _write_event(self, event):
+        self.wfile.write(dumps(event) + b"\n")
+        self.wfile.flush()
+
+    def _stream_calculation(self, url, timings, debug):
+        events = stream_recipe_calories(url, USDA_API_KEY)
+        try:
+            first = next(events)
+        except Exception as e:
+            # Nothing sent yet, so this still gets a real status code
+            status, payload = error_response(e, GENERIC_ERROR)
+            self._send_json(status, attach_debug(payload, timings) if debug else payload, timings)
+            return
+
+        self._send_headers(200, "application/x-ndjson", timings)
+        try:
+            self._write_event(first)
+            for event in events:
+                if debug and event["type"] == "totals":
+                    attach_debug(event, timings)
+                self._write_event(event)
+        except (BrokenPipeError, ConnectionResetError):
+            events.close()  # client went away; drop the lookups not started yet
+        except Exception as e:
+            _status, payload = error_response(e, GENERIC_ERROR)
+            if debug:
+                attach_debug(payload, timings)
+            self._write_event({"type": "error", **payload})
 
     def do_OPTIONS(self):
         self._send_json(200, {})
@@ -54,8 +110,8 @@ class handler(BaseHTTPRequestHandler):
             self._send_json(400, {"error": "Invalid JSON body. Expected: {\"url\": \"...\"}"})
             return
 
-        if not USDA_API_KEY:
-            self._send_json(500, {"error": "The server encountered a configuration error. Please try again later.", "debug": "USDA_API_KEY environment variable not set."})
+        if not USDA_API_KEY and not USDA_LOCAL_DB:
+            self._send_json(500, {"error": "The server encountered a configuration error. Please try again later.", "debug": "Neither USDA_API_KEY nor USDA_LOCAL_DB environment variable is set."})
             return
 
         url = data.get("url", "").strip()
@@ -67,20 +123,15 @@ class handler(BaseHTTPRequestHandler):
             self._send_json(400, {"error": "URL must start with http:// or https://"})
             return
 
-        try:
-            result = calculate_recipe(url, USDA_API_KEY)
-            # Remove 'amounts' from each ingredient (contains tuples, not JSON-serializable,
-            # and not needed by the frontend)
-            for ing in result.get("ingredients", []):
-                ing.pop("amounts", None)
-            self._send_json(200, result)
-        except requests.exceptions.HTTPError as e:
-            status = e.response.status_code if e.response is not None else 'unknown'
-            self._send_json(400, {
-                "error": "This website blocked our request. Please try a different URL.",
-                "debug": f"HTTP {status}",
-            })
-        except ValueError as e:
-            self._send_json(400, {"error": str(e)})
-        except Exception:
-            self._send_json(500, {"error": "Something went wrong while analyzing this recipe. Please try again.", "debug": traceback.format_exc()})
+        debug = bool(data.get("debug"))
+        with collect() as timings:
+            if data.get("stream"):
+                self._stream_calculation(url, timings, debug)
+                return
+
+            try:
+                status, payload = 200, calculate_recipe(url, USDA_API_KEY).to_wire()
+            except Exception as e:
+                status, payload = error_response(e, GENERIC_ERROR)
+
+        self._send_json(status, attach_debug(payload, timings) if debug else payload, timings)
@@ -0,0 +1,106 @@
+"""
+Vercel Python serverless function for calorie calculation of many recipes.
+
+POST /api/calculate_batch
+Body: { "urls": ["https://example.com/recipe", ...] }
+Returns: JSON { "results": [...] } with one entry per URL, in order:
+  { "url", "status": 200, "recipe": {...} }   the /api/calculate payload
+  { "url", "status", "error", "debug" }       classified like /api/calculate
+Pages are fetched concurrently and USDA lookups are shared across the batch.
+"""
+
+import json
+import os
+import traceback
+from http.server import BaseHTTPRequestHandler
+
+from api.records import dumps
+
+# Point NLTK to bundled data before importing recipe_logic
+# (ingredient-parser-nlp needs averaged_perceptron_tagger_eng)
+import pathlib
+os.environ["NLTK_DATA"] = str(pathlib.Path(__file__).parent / "nltk_data")
+
+# Defer the import so we can catch and report errors
+_import_error = None
+try:
+    from api.recipe_logic import calculate_recipes
+    from api.scraping import error_response
+except Exception:
+    _import_error = traceback.format_exc()
+    calculate_recipes = None
+
+USDA_API_KEY = os.environ.get("USDA_API_KEY")
+USDA_LOCAL_DB = os.environ.get("USDA_LOCAL_DB")
+# Most URLs accepted per request (a week of three meals a day, with room)
+BATCH_MAX_URLS = int(os.environ.get("BATCH_MAX_URLS", 30))
+
+
+class handler(BaseHTTPRequestHandler):
+    def _send_json(self, status, data):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        self.end_headers()
+        self.wfile.write(dumps(data))
+
+    def do_OPTIONS(self):
+        self._send_json(200, {})
+
+    def do_POST(self):
+        if _import_error:
+            self._send_json(500, {"error": "The server encountered a configuration error. Please try again later.", "debug": str(_import_error)})
+            return
+
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(content_length)
+            data = json.loads(body)
+        except (json.JSONDecodeError, ValueError):
+            self._send_json(400, {"error": "Invalid JSON body. Expected: {\"urls\": [\"...\"]}"})
+            return
+
+        if not USDA_API_KEY and not USDA_LOCAL_DB:
+            self._send_json(500, {"error": "The server encountered a configuration error. Please try again later.", "debug": "Neither USDA_API_KEY nor USDA_LOCAL_DB environment variable is set."})
+            return
+
+        urls = data.get("urls")
+        if not isinstance(urls, list) or not urls:
+            self._send_json(400, {"error": "Missing 'urls' list in request body."})
+            return
+
+        if len(urls) > BATCH_MAX_URLS:
+            self._send_json(400, {"error": f"Too many URLs: at most {BATCH_MAX_URLS} per request."})
+            return
+
+        # Bad entries are reported in place; the rest still get calculated
+        entries = []
+        for url in urls:
+            url = url.strip() if isinstance(url, str) else ""
+            if not url:
+                entries.append({"url": url, "status": 400, "error": "Missing URL."})
+            elif not url.startswith(("http://", "https://")):
+                entries.append({"url": url, "status": 400, "error": "URL must start with http:// or https://"})
+            else:
+                entries.append({"url": url})
+
+        try:
+            valid = [entry["url"] for entry in entries if "status" not in entry]
+            outcomes = iter(calculate_recipes(valid, USDA_API_KEY) if valid else [])
+        except Exception as e:
+            self._send_json(*error_response(e, "Something went wrong while analyzing these recipes. Please try again."))
+            return
+
+        for entry in entries:
+            if "status" in entry:
+                continue
+            outcome = next(outcomes)
+            if isinstance(outcome, Exception):
+                status, payload = error_response(outcome, "Something went wrong while analyzing this recipe. Please try again.")
+                entry.update(status=status, **payload)
+                continue
+            entry.update(status=200, recipe=outcome)
+
+        self._send_json(200, {"results": entries})
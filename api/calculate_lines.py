@@ -0,0 +1,107 @@
+"""
+Vercel Python serverless function for calorie calculation of ingredient
+lines sent directly (pasted, or edited after an /api/calculate call).
+
+POST /api/calculate_lines
+Body: {
+  "ingredients": ["2 cups flour", ...],
+  "title": "My bread",        optional
+  "servings": 8,               optional
+  "previous": [...],           optional: the "ingredients" of an earlier response
+  "debug": false
+}
+Returns: the same JSON shape as /api/calculate. Lines whose text matches an
+entry in "previous" reuse that entry, so re-sending a recipe with one line
+changed only parses and looks up that line. No page is fetched.
+"""
+
+import json
+import os
+import traceback
+from http.server import BaseHTTPRequestHandler
+
+from api.records import dumps
+
+# Point NLTK to bundled data before importing recipe_logic
+# (ingredient-parser-nlp needs averaged_perceptron_tagger_eng)
+import pathlib
+os.environ["NLTK_DATA"] = str(pathlib.Path(__file__).parent / "nltk_data")
+
+# Defer the import so we can catch and report errors
+_import_error = None
+try:
+    from api.recipe_logic import calculate_from_lines
+    from api.scraping import _parse_servings, error_response
+    from api.timing import attach_debug, collect
+except Exception:
+    _import_error = traceback.format_exc()
+    calculate_from_lines = None
+
+USDA_API_KEY = os.environ.get("USDA_API_KEY")
+USDA_LOCAL_DB = os.environ.get("USDA_LOCAL_DB")
+# Most ingredient lines accepted per request
+LINES_MAX_INGREDIENTS = int(os.environ.get("LINES_MAX_INGREDIENTS", 100))
+
+
+class handler(BaseHTTPRequestHandler):
+    def _send_json(self, status, data, timings=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if timings is not None:
+            self.send_header("Server-Timing", timings.header())
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        self.end_headers()
+        self.wfile.write(dumps(data))
+
+    def do_OPTIONS(self):
+        self._send_json(200, {})
+
+    def do_POST(self):
+        if _import_error:
+            self._send_json(500, {"error": "The server encountered a configuration error. Please try again later.", "debug": str(_import_error)})
+            return
+
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(content_length)
+            data = json.loads(body)
+        except (json.JSONDecodeError, ValueError):
+            self._send_json(400, {"error": "Invalid JSON body. Expected: {\"ingredients\": [\"...\"]}"})
+            return
+
+        if not USDA_API_KEY and not USDA_LOCAL_DB:
+            self._send_json(500, {"error": "The server encountered a configuration error. Please try again later.", "debug": "Neither USDA_API_KEY nor USDA_LOCAL_DB environment variable is set."})
+            return
+
+        lines = data.get("ingredients")
+        if not isinstance(lines, list) or not all(isinstance(line, str) for line in lines):
+            self._send_json(400, {"error": "Missing 'ingredients' list of strings in request body."})
+            return
+        lines = [line.strip() for line in lines if line.strip()]
+        if not lines:
+            self._send_json(400, {"error": "No ingredient lines to calculate."})
+            return
+        if len(lines) > LINES_MAX_INGREDIENTS:
+            self._send_json(400, {"error": f"Too many ingredient lines: at most {LINES_MAX_INGREDIENTS} per request."})
+            return
+
+        previous = data.get("previous")
+        if previous is not None and not isinstance(previous, list):
+            self._send_json(400, {"error": "'previous' must be the ingredients list of an earlier result."})
+            return
+
+        title = data.get("title")
+        title = title.strip() or None if isinstance(title, str) else None
+        servings = _parse_servings(data.get("servings"))
+
+        with collect() as timings:
+            try:
+                status, payload = 200, calculate_from_lines(lines, USDA_API_KEY, title, servings, previous).to_wire()
+            except Exception as e:
+                status, payload = error_response(e, "Something went wrong while analyzing these ingredients. Please try again.")
+
+        if data.get("debug"):
+            attach_debug(payload, timings)
+        self._send_json(status, payload, timings)
@@ -0,0 +1,171 @@
+"""
+Local FoodData Central store — an offline alternative to the USDA search API.
+
+Build it once from the SR Legacy and Foundation CSV bulk downloads
+(https://fdc.nal.usda.gov/download-datasets):
+
+    python -m api.fdc_local build fdc.sqlite \
+        FoodData_Central_sr_legacy_food_csv_2018-04/ \
+        FoodData_Central_foundation_food_csv_2024-10-31/
+
+then set USDA_LOCAL_DB=fdc.sqlite. search_usda_calories will query this
+file instead of api.nal.usda.gov, so no API key or network is needed.
+
+The store is a plain SQLite database with an FTS5 index over food
+descriptions; only the energy value is kept for each food.
+"""
+
+import argparse
+import csv
+import os
+import re
+import sqlite3
+import threading
+
+# data_type values used in food.csv for the datasets the live search asks for
+# ("dataType": "SR Legacy,Foundation")
+FDC_DATA_TYPES = ("sr_legacy_food", "foundation_food")
+# Nutrient numbers for Energy in kcal (varies by data type)
+# 208 = SR Legacy, 957/958 = Foundation (Atwater factors)
+ENERGY_NUTRIENT_NUMBERS = ("208", "957", "958")
+
+_SCHEMA = """
+CREATE TABLE foods (
+    fdc_id INTEGER PRIMARY KEY,
+    description TEXT NOT NULL,
+    data_type TEXT NOT NULL,
+    energy_nutrient_number TEXT,
+    kcal REAL
+);
+CREATE VIRTUAL TABLE foods_fts USING fts5(
+    description, content='foods', content_rowid='fdc_id'
+);
+"""
+
+_local = threading.local()
+
+
+def build_database(db_path, csv_dirs):
+    """Import food.csv / nutrient.csv / food_nutrient.csv from each directory.
+
+    Keeps SR Legacy and Foundation foods and their kcal value, preferring the
+    nutrient numbers in ENERGY_NUTRIENT_NUMBERS order. Returns the food count.
+    """
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(_SCHEMA)
+
+    count = 0
+    for csv_dir in csv_dirs:
+        # nutrient id -> energy nutrient number, for kcal energy nutrients only
+        energy_ids = {}
+        with open(os.path.join(csv_dir, "nutrient.csv"), newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                number = str(row.get("nutrient_nbr", "")).split(".")[0]
+                if number in ENERGY_NUTRIENT_NUMBERS and row.get("unit_name", "").upper() == "KCAL":
+                    energy_ids[row["id"]] = number
+
+        foods = {}
+        with open(os.path.join(csv_dir, "food.csv"), newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row["data_type"] in FDC_DATA_TYPES:
+                    foods[row["fdc_id"]] = [row["description"], row["data_type"], None, None]
+
+        with open(os.path.join(csv_dir, "food_nutrient.csv"), newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                number = energy_ids.get(row["nutrient_id"])
+                food = foods.get(row["fdc_id"])
+                if number is None or food is None or not row.get("amount"):
+                    continue
+                current = food[2]
+                if current is None or (
+                    ENERGY_NUTRIENT_NUMBERS.index(number) < ENERGY_NUTRIENT_NUMBERS.index(current)
+                ):
+                    food[2] = number
+                    food[3] = float(row["amount"])
+
+        conn.executemany(
+            "INSERT OR REPLACE INTO foods VALUES (?, ?, ?, ?, ?)",
+            ((int(fdc_id), *values) for fdc_id, values in foods.items()),
+        )
+        count += len(foods)
+
+    conn.execute("INSERT INTO foods_fts(foods_fts) VALUES ('rebuild')")
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    return count
+
+
+def _connect(db_path):
+    """Read-only connection, one per thread (sqlite3 connections aren't shareable)."""
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(db_path)
+    if conn is None:
+        if not os.path.exists(db_path):
+            # Not a ValueError: error_response() would show that (and the path) to users
+            raise FileNotFoundError(f"Local USDA database not found: {db_path}")
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        conns[db_path] = conn
+    return conn
+
+
+def search_local_foods(db_path, query, limit=5):
+    """Full-text search the local store, best match first.
+
+    Requires every query word to appear, falling back to any word if that
+    finds nothing. Returns food dicts in the same shape as the live API's
+    "foods" list (description + foodNutrients), so callers can treat both
+    backends the same way.
+    """
+    words = re.findall(r"\w+", query.lower())
+    if not words:
+        return []
+    conn = _connect(db_path)
+    terms = ['"' + w + '"' for w in words]
+    rows = []
+    for match in (" ".join(terms), " OR ".join(terms)):
+        rows = conn.execute(
+            "SELECT f.description, f.energy_nutrient_number, f.kcal "
+            "FROM foods_fts JOIN foods f ON f.fdc_id = foods_fts.rowid "
+            "WHERE foods_fts MATCH ? "
+            "ORDER BY bm25(foods_fts), length(f.description) LIMIT ?",
+            (match, limit),
+        ).fetchall()
+        if rows or len(terms) == 1:
+            break
+
+    foods = []
+    for description, number, kcal in rows:
+        nutrients = []
+        if kcal is not None:
+            nutrients.append({"nutrientNumber": number, "unitName": "KCAL", "value": kcal})
+        foods.append({"description": description, "foodNutrients": nutrients})
+    return foods
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="import FDC CSV downloads into a SQLite store")
+    build.add_argument("db_path")
+    build.add_argument("csv_dirs", nargs="+")
+    search = sub.add_parser("search", help="query a built store")
+    search.add_argument("db_path")
+    search.add_argument("query")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        count = build_database(args.db_path, args.csv_dirs)
+        print(f"Imported {count} foods into {args.db_path}")
+    else:
+        for food in search_local_foods(args.db_path, args.query):
+            kcal = food["foodNutrients"][0]["value"] if food["foodNutrients"] else None
+            print(f"{kcal!s:>8}  {food['description']}")
+
+
+if __name__ == "__main__":
+    main()
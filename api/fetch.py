@@ -0,0 +1,215 @@
+"""
+Recipe page downloads, shared by the calorie and cook mode endpoints.
+
+Pages are kept in a local SQLite cache (PAGE_CACHE_DB) with their ETag and
+Last-Modified headers. Within PAGE_CACHE_MAX_AGE seconds a cached page is
+served as-is; after that it is revalidated with If-None-Match /
+If-Modified-Since, and a 304 reuses the stored body.
+
+All outbound HTTP goes through long-lived pooled sessions, so repeat
+requests to a host (USDA above all) reuse a kept-alive TLS connection.
+
+HTTP_MODE=record saves every response those sessions get under
+HTTP_CASSETTE_DIR; HTTP_MODE=replay serves only the saved responses and
+never touches the network, for load tests and CI.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import cloudscraper
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from api.cache import DiskCache
+from api.timing import span
+
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+# Connection pooling: hosts kept per session, connections kept per host, and
+# whether to wait for a free connection (hard per-host limit) instead of
+# opening an extra one.
+HTTP_POOL_CONNECTIONS = int(os.environ.get("HTTP_POOL_CONNECTIONS", 20))
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", 10))
+HTTP_POOL_BLOCK = os.environ.get("HTTP_POOL_BLOCK", "") == "1"
+# Most recently used hosts that keep their own cloudscraper session
+CLOUDSCRAPER_MAX_HOSTS = int(os.environ.get("CLOUDSCRAPER_MAX_HOSTS", 32))
+
+# Page cache location ("" disables it), freshness window and size bound.
+# /tmp is the only writable path on serverless instances.
+PAGE_CACHE_DB = os.environ.get("PAGE_CACHE_DB", "/tmp/recipe_pages.sqlite")
+PAGE_CACHE_MAX_AGE = float(os.environ.get("PAGE_CACHE_MAX_AGE", 3600))
+PAGE_CACHE_MAX_ENTRIES = int(os.environ.get("PAGE_CACHE_MAX_ENTRIES", 500))
+_PAGE_CACHE = DiskCache(PAGE_CACHE_DB, "pages", PAGE_CACHE_MAX_ENTRIES) if PAGE_CACHE_DB else None
+
+# Outbound HTTP: "live", "record" (live, saving each response to
+# HTTP_CASSETTE_DIR) or "replay" (saved responses only; a miss is a
+# ConnectionError)
+HTTP_MODE = os.environ.get("HTTP_MODE", "live")
+HTTP_CASSETTE_DIR = os.environ.get("HTTP_CASSETTE_DIR", "/tmp/http_cassettes")
+# Query parameters kept out of cassette file names and contents
+_REDACTED_PARAMS = {"api_key"}
+# Response headers that no longer apply once the body is saved decoded
+_UNSAVED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+
+def _redact(url):
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in _REDACTED_PARAMS]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class CassetteAdapter(BaseAdapter):
+    """Records responses from `inner` to disk, or replays them without it.
+
+    Each response is a JSON file under HTTP_CASSETTE_DIR/<kind>/, named by
+    a hash of the method and URL (minus api_key), so re-recording a request
+    overwrites it and anything else in the directory is left alone. A 304
+    answer to the page cache's conditional GET isn't recorded, so it never
+    replaces the page's full recording.
+    """
+
+    def __init__(self, kind, inner=None):
+        super().__init__()
+        self.directory = pathlib.Path(HTTP_CASSETTE_DIR) / kind
+        self.inner = inner
+
+    def _path(self, method, url):
+        return self.directory / f"{hashlib.sha1(f'{method} {url}'.encode()).hexdigest()}.json"
+
+    def send(self, request, **kwargs):
+        url = _redact(request.url)
+        path = self._path(request.method, url)
+        if HTTP_MODE == "replay":
+            try:
+                saved = json.loads(path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                raise requests.ConnectionError(f"No recorded response for {request.method} {url}", request=request)
+            resp = requests.Response()
+            resp.status_code = saved["status"]
+            resp.reason = saved["reason"]
+            resp.headers = CaseInsensitiveDict(saved["headers"])
+            resp._content = saved["body"].encode("utf-8")
+            resp.encoding = "utf-8"
+            resp.url = request.url
+            resp.request = request
+            return resp
+
+        resp = self.inner.send(request, **kwargs)
+        if resp.status_code == 304:
+            return resp
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({
+            "method": request.method,
+            "url": url,
+            "status": resp.status_code,
+            "reason": resp.reason,
+            "headers": {k: v for k, v in resp.headers.items() if k.lower() not in _UNSAVED_HEADERS},
+            "body": resp.text,
+        }), encoding="utf-8")
+        os.replace(tmp, path)
+        return resp
+
+    def close(self):
+        if self.inner is not None:
+            self.inner.close()
+
+
+def _mount_cassette(session, kind):
+    """Put a CassetteAdapter in front of the session's adapters (record/replay modes only)."""
+    if HTTP_MODE not in ("record", "replay"):
+        return
+    for prefix in ("https://", "http://"):
+        session.mount(prefix, CassetteAdapter(kind, session.get_adapter(prefix)))
+
+
+def _pooled_session(kind):
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        pool_block=HTTP_POOL_BLOCK,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    _mount_cassette(session, kind)
+    return session
+
+
+# One session for the USDA API, one for recipe sites
+USDA_SESSION = _pooled_session("usda")
+PAGE_SESSION = _pooled_session("pages")
+
+_cloudscrapers = OrderedDict()  # host -> cloudscraper session
+_cloudscrapers_lock = threading.Lock()
+
+
+def _cloudscraper_for(url):
+    """Reuse one cloudscraper session (and its solved challenge cookies) per host."""
+    host = urlsplit(url).netloc.lower()
+    with _cloudscrapers_lock:
+        session = _cloudscrapers.get(host)
+        if session is None:
+            session = _cloudscrapers[host] = cloudscraper.create_scraper()
+            # Its own kind: same URL as the blocked first attempt, different answer
+            _mount_cassette(session, "cloudscraper")
+            while len(_cloudscrapers) > CLOUDSCRAPER_MAX_HOSTS:
+                _cloudscrapers.popitem(last=False)[1].close()
+        _cloudscrapers.move_to_end(host)
+        return session
+
+
+def fetch_page(url):
+    """Return the HTML for a recipe URL, using the page cache when possible.
+
+    Blocked sites (403/500) are retried with cloudscraper. Raises
+    requests.HTTPError if the page still can't be fetched.
+    """
+    with span("fetch"):
+        cached = _PAGE_CACHE.get(url) if _PAGE_CACHE is not None else None
+        if cached and time.time() - cached["fetched"] < PAGE_CACHE_MAX_AGE:
+            return cached["body"]
+
+        headers = dict(BROWSER_HEADERS)
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        resp = PAGE_SESSION.get(url, headers=headers, timeout=15)
+        if resp.status_code == 304 and cached:
+            cached["fetched"] = time.time()
+            _PAGE_CACHE.set(url, cached)
+            return cached["body"]
+
+        if resp.status_code in (403, 500):
+            # Anti-bot protected site — retry with cloudscraper
+            resp = _cloudscraper_for(url).get(url, timeout=15)
+        # Some sites return 500 but still send full HTML with recipe data
+        if resp.status_code != 500 or len(resp.text) < 1000:
+            resp.raise_for_status()
+
+        if resp.status_code == 200 and _PAGE_CACHE is not None:
+            _PAGE_CACHE.set(url, {
+                "body": resp.text,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "fetched": time.time(),
+            })
+        return resp.text
@@ -0,0 +1,103 @@
+"""
+Host-wide request budgets for rate-limited upstream APIs.
+
+A TokenBucket lives in a SQLite file, so every worker process (and every
+warm serverless instance sharing /tmp) draws from the same budget instead
+of each one discovering the limit through 429s. Like DiskCache it is
+best-effort: if the database can't be used, requests are let through.
+"""
+
+import sqlite3
+import threading
+import time
+
+
+class TokenBucket:
+    """`capacity` tokens refilled continuously at `per_second`, stored under `name`.
+
+    observe() and drain() pull the local count down to what the upstream
+    reports, so the bucket follows the real quota even when other hosts
+    share the same key.
+    """
+
+    def __init__(self, path, name, capacity, per_second):
+        self.path = path
+        self.name = name
+        self.capacity = float(capacity)
+        self.per_second = float(per_second)
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit, so _update() can take the write lock up front
+            conn = sqlite3.connect(self.path, timeout=2.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def _update(self, change):
+        """Refill, apply change(tokens) -> (tokens, result), store; return result."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (self.name,)).fetchone()
+            now = time.time()
+            tokens = self.capacity
+            if row is not None:
+                tokens = min(self.capacity, row[0] + max(0.0, now - row[1]) * self.per_second)
+            tokens, result = change(tokens)
+            conn.execute("INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)", (self.name, tokens, now))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+    def try_acquire(self):
+        """Take a token if one is available. Returns 0.0, or the seconds until one will be."""
+        def take(tokens):
+            if tokens >= 1:
+                return tokens - 1, 0.0
+            return tokens, (1 - tokens) / self.per_second if self.per_second > 0 else float("inf")
+
+        try:
+            return self._update(take)
+        except sqlite3.Error:
+            return 0.0
+
+    def acquire(self, max_wait):
+        """Take a token, waiting up to max_wait seconds for one. Returns False if none came."""
+        deadline = time.monotonic() + max_wait
+        while True:
+            wait = self.try_acquire()
+            if wait == 0.0:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def observe(self, remaining):
+        """Lower the local count to an upstream 'remaining' figure (e.g. X-RateLimit-Remaining)."""
+        try:
+            remaining = float(remaining)
+        except (TypeError, ValueError):
+            return
+        try:
+            self._update(lambda tokens: (min(tokens, remaining), None))
+        except sqlite3.Error:
+            pass
+
+    def drain(self):
+        """Empty the bucket, e.g. after a 429; it refills at the normal rate."""
+        self.observe(0)
+
+    def remaining(self):
+        try:
+            return self._update(lambda tokens: (tokens, tokens))
+        except sqlite3.Error:
+            return None
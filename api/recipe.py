@@ -0,0 +1,151 @@
+"""
+Vercel Python serverless function returning cook mode data and the calorie
+breakdown for a recipe in one call. The app uses it instead of calling
+/api/cook and /api/calculate separately: those run as separate functions,
+so only this one can download and scrape the page once for both views.
+
+POST /api/recipe
+Body: { "url": "https://example.com/recipe", "stream": false, "debug": false }
+Returns: JSON { "cook": {...}, "nutrition": {...} } where each part is the
+/api/cook or /api/calculate payload, or { "error", "debug" } if that part
+failed. Stage durations go in a Server-Timing header, and in the payload's
+debug field when "debug" is true.
+
+With "stream": true the response is NDJSON: cook mode data first, as soon
+as it's ready, then /api/calculate's streamed events:
+  {"type": "cook", "status", "cook": {...}}   cook is { "error", "debug" } if it failed
+  {"type": "recipe", ...}, {"type": "ingredient", ...}, {"type": "totals", ...}
+A calorie failure ends the stream with {"type": "error", "error", "debug"}.
+If both parts fail, the response is an ordinary JSON error.
+"""
+
+import json
+import os
+import traceback
+from http.server import BaseHTTPRequestHandler
+
+from api.records import dumps
+
+# Point NLTK to bundled data before importing recipe_logic
+# (ingredient-parser-nlp needs averaged_perceptron_tagger_eng)
+import pathlib
+os.environ["NLTK_DATA"] = str(pathlib.Path(__file__).parent / "nltk_data")
+
+# Defer the import so we can catch and report errors
+_import_error = None
+try:
+    from api.recipe_logic import calculate_recipe, stream_recipe_calories
+    from api.scraping import error_response, scrape_cook_data
+    from api.timing import attach_debug, collect
+except Exception:
+    _import_error = traceback.format_exc()
+    calculate_recipe = None
+
+USDA_API_KEY = os.environ.get("USDA_API_KEY")
+USDA_LOCAL_DB = os.environ.get("USDA_LOCAL_DB")
+COOK_ERROR = "Something went wrong while loading this recipe. Please try again."
+NUTRITION_ERROR = "Something went wrong while analyzing this recipe. Please try again."
+
+
+class handler(BaseHTTPRequestHandler):
+    def _send_headers(self, status, content_type, timings=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if timings is not None:
+            self.send_header("Server-Timing", timings.header())
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        if content_type == "application/x-ndjson":
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+    def _send_json(self, status, data, timings=None):
+        self._send_headers(status, "application/json", timings)
+        self.wfile.write(dumps(data))
+
+    def _write_event(self, event):
+        self.wfile.write(dumps(event) + b"\n")
+        self.wfile.flush()
+
+    def _stream_recipe(self, url, cook_status, cook, timings, debug):
+        events = stream_recipe_calories(url, USDA_API_KEY)
+        first = None
+        if cook_status != 200:
+            # Nothing usable if the calories fail too, so wait for them before answering
+            try:
+                first = next(events)
+            except Exception:
+                self._send_json(cook_status, attach_debug(cook, timings) if debug else cook, timings)
+                return
+
+        self._send_headers(200, "application/x-ndjson", timings)
+        try:
+            self._write_event({"type": "cook", "status": cook_status, "cook": cook})
+            if first is not None:
+                self._write_event(first)
+            for event in events:
+                if debug and event["type"] == "totals":
+                    attach_debug(event, timings)
+                self._write_event(event)
+        except (BrokenPipeError, ConnectionResetError):
+            events.close()  # client went away; drop the lookups not started yet
+        except Exception as e:
+            _status, payload = error_response(e, NUTRITION_ERROR)
+            if debug:
+                attach_debug(payload, timings)
+            self._write_event({"type": "error", **payload})
+
+    def do_OPTIONS(self):
+        self._send_json(200, {})
+
+    def do_POST(self):
+        if _import_error:
+            self._send_json(500, {"error": "The server encountered a configuration error. Please try again later.", "debug": str(_import_error)})
+            return
+
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(content_length)
+            data = json.loads(body)
+        except (json.JSONDecodeError, ValueError):
+            self._send_json(400, {"error": "Invalid JSON body. Expected: {\"url\": \"...\"}"})
+            return
+
+        if not USDA_API_KEY and not USDA_LOCAL_DB:
+            self._send_json(500, {"error": "The server encountered a configuration error. Please try again later.", "debug": "Neither USDA_API_KEY nor USDA_LOCAL_DB environment variable is set."})
+            return
+
+        url = data.get("url", "").strip()
+        if not url:
+            self._send_json(400, {"error": "Missing 'url' field in request body."})
+            return
+
+        if not url.startswith(("http://", "https://")):
+            self._send_json(400, {"error": "URL must start with http:// or https://"})
+            return
+
+        # Both parts read the same extract_recipe() result, so the second
+        # one neither refetches nor rescrapes the page.
+        debug = bool(data.get("debug"))
+        with collect() as timings:
+            try:
+                cook_status, cook = 200, scrape_cook_data(url)
+            except Exception as e:
+                cook_status, cook = error_response(e, COOK_ERROR)
+
+            if data.get("stream"):
+                self._stream_recipe(url, cook_status, cook, timings, debug)
+                return
+
+            try:
+                nutrition_status, nutrition = 200, calculate_recipe(url, USDA_API_KEY).to_wire()
+            except Exception as e:
+                nutrition_status, nutrition = error_response(e, NUTRITION_ERROR)
+
+        if cook_status != 200 and nutrition_status != 200:
+            # Nothing usable — report the page-level error like /api/cook does
+            self._send_json(cook_status, attach_debug(cook, timings) if debug else cook, timings)
+            return
+        payload = {"cook": cook, "nutrition": nutrition}
+        self._send_json(200, attach_debug(payload, timings) if debug else payload, timings)
@@ -3,31 +3,128 @@ Recipe Calorie Calculator — Backend Logic
 Extracted from the original recipe_calculator.py (lines 1-799).
 
 All parsing, conversion, and USDA lookup logic is preserved unchanged.
+Page scraping and ingredient-line normalization live in api/scraping.py.
 """
 
+import contextvars
+import hashlib
 import json
 import os
+import queue
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from fractions import Fraction
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 import pint
-import cloudscraper
-import requests
+from ingredient_parser import __version__ as INGREDIENT_PARSER_VERSION
 from ingredient_parser import parse_ingredient
-from bs4 import BeautifulSoup
-from recipe_scrapers import scrape_html
+from recipe_scrapers.__version__ import __version__ as RECIPE_SCRAPERS_VERSION
+
+from api.cache import DiskCache, SingleFlight, SnapshotFile, TTLCache
+from api.fdc_local import ENERGY_NUTRIENT_NUMBERS, search_local_foods
+from api.fetch import USDA_SESSION
+from api.ratelimit import TokenBucket
+from api.records import IngredientResult, RecipeResult
+from api.timing import span, submit
+# Scraping/normalization moved to api/scraping.py; re-exported for callers
+from api.scraping import (  # noqa: F401
+    NORMALIZATION_VERSION,
+    UNIT_NORMALIZATIONS,
+    _fallback_scrape_html,
+    _normalize_raw_ingredient,
+    _parse_servings,
+    _simplify_alternatives,
+    extract_recipe,
+    fetch_recipe_page,
+    normalize_ingredient_lines,
+    scrape_recipe,
+    validate_recipe_data,
+)
 
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
 
-USDA_BASE = "https://api.nal.usda.gov/fdc/v1"
-# Nutrient numbers for Energy in kcal (varies by data type)
-# 208 = SR Legacy, 957/958 = Foundation (Atwater factors)
-ENERGY_NUTRIENT_NUMBERS = ("208", "957", "958")
+# FoodData Central API root; point it at scripts/usda_stub.py for load tests
+USDA_BASE = os.environ.get("USDA_BASE", "https://api.nal.usda.gov/fdc/v1").rstrip("/")
+# Path to a local FoodData Central store built with `python -m api.fdc_local
+# build`. When set, lookups never touch the network.
+USDA_LOCAL_DB = os.environ.get("USDA_LOCAL_DB")
+if USDA_LOCAL_DB and not os.path.exists(USDA_LOCAL_DB):
+    # Checked once here; the handlers report a failed import as a configuration error
+    raise FileNotFoundError(f"USDA_LOCAL_DB is set but the file does not exist: {USDA_LOCAL_DB}")
+
+# USDA lookup cache, keyed on the cleaned ingredient name. Misses ("not found",
+# no energy data) are cached too, but expire sooner than real matches.
+USDA_CACHE_SIZE = int(os.environ.get("USDA_CACHE_SIZE", 2048))
+USDA_CACHE_TTL = float(os.environ.get("USDA_CACHE_TTL", 24 * 3600))
+USDA_CACHE_NEGATIVE_TTL = float(os.environ.get("USDA_CACHE_NEGATIVE_TTL", 3600))
+_USDA_CACHE = TTLCache(USDA_CACHE_SIZE, USDA_CACHE_TTL, USDA_CACHE_NEGATIVE_TTL)
+# Lookups resolved at build time (python -m scripts.build_usda_snapshot) and
+# deployed with the function, so cold instances skip USDA for common
+# ingredients. "" disables it; a missing file is simply empty.
+USDA_SNAPSHOT = os.environ.get("USDA_SNAPSHOT", os.path.join(os.path.dirname(__file__), "usda_snapshot.tsv"))
+_USDA_SNAPSHOT = SnapshotFile(USDA_SNAPSHOT) if USDA_SNAPSHOT else None
+# Concurrent lookups of the same cleaned name share one USDA request
+_USDA_FLIGHTS = SingleFlight()
+
+# Host-wide USDA request budget (api.data.gov allows 1000/hour per key),
+# shared by every worker through SQLite ("" disables it). A lookup waits up
+# to USDA_BUDGET_MAX_WAIT seconds for a token, then degrades to a stale
+# cached result or an unresolved ingredient instead of failing the recipe.
+USDA_BUDGET_DB = os.environ.get("USDA_BUDGET_DB", "/tmp/usda_budget.sqlite")
+USDA_BUDGET_PER_HOUR = int(os.environ.get("USDA_BUDGET_PER_HOUR", 1000))
+USDA_BUDGET_MAX_WAIT = float(os.environ.get("USDA_BUDGET_MAX_WAIT", 2))
+_USDA_BUDGET = (
+    TokenBucket(USDA_BUDGET_DB, "usda", USDA_BUDGET_PER_HOUR, USDA_BUDGET_PER_HOUR / 3600)
+    if USDA_BUDGET_DB else None
+)
+
+# Memo of parsed ingredient lines, keyed by the raw line. Set PARSE_CACHE_DB
+# to a SQLite path to also share it between workers on the same host; its
+# entries are namespaced by the parser and line-normalization versions.
+PARSE_CACHE_SIZE = int(os.environ.get("PARSE_CACHE_SIZE", 4096))
+PARSE_CACHE_DB = os.environ.get("PARSE_CACHE_DB")
+_PARSE_CACHE = TTLCache(PARSE_CACHE_SIZE, ttl=float("inf"))
+_PARSE_DISK_CACHE = (
+    DiskCache(PARSE_CACHE_DB, f"parse-{INGREDIENT_PARSER_VERSION}-n{NORMALIZATION_VERSION}")
+    if PARSE_CACHE_DB else None
+)
+
+# Max concurrent USDA lookups per recipe (1 = sequential)
+USDA_MAX_WORKERS = int(os.environ.get("USDA_MAX_WORKERS", 8))
+# Max concurrent page fetches in calculate_recipes()
+BATCH_FETCH_WORKERS = int(os.environ.get("BATCH_FETCH_WORKERS", 8))
+
+# Concurrent calculate_recipe() calls for one recipe URL share a single
+# run, and its result is handed out again for RECIPE_COALESCE_GRACE seconds
+# after it finishes (0 = coalesce only while running).
+RECIPE_COALESCE_GRACE = float(os.environ.get("RECIPE_COALESCE_GRACE", 10))
+RECIPE_COALESCE_SIZE = int(os.environ.get("RECIPE_COALESCE_SIZE", 256))
+_RECIPE_FLIGHTS = SingleFlight()
+_RECENT_RECIPES = TTLCache(RECIPE_COALESCE_SIZE, RECIPE_COALESCE_GRACE)
+# Whole calculate_recipe() results, keyed by recipe URL, a hash of the
+# fetched page and _RESULT_FINGERPRINT. Recipes with unresolved ingredients
+# expire as soon as USDA misses do. RESULT_CACHE_DB adds a SQLite copy
+# shared between workers on the same host.
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", 512))
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", USDA_CACHE_TTL))
+RESULT_CACHE_DB = os.environ.get("RESULT_CACHE_DB")
+RESULT_CACHE_DB_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_DB_MAX_ENTRIES", 2000))
+# Bump when a code change alters results for the same page and tables
+RESULT_CACHE_VERSION = 1
+_RESULT_CACHE = TTLCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL, USDA_CACHE_NEGATIVE_TTL)
+# Query parameters that only track where a link was shared
+_TRACKING_PARAMS = re.compile(r"^(?:utm_\w+|fbclid|gclid|mc_cid|mc_eid|igshid)$", re.IGNORECASE)
 
 # Unit registry shared across the app
 UREG = pint.UnitRegistry()
+# Unit name -> ("mass" | "volume", factor) or None; see _resolve_unit
+_UNIT_FACTORS = {}
+_UNIT_FACTORS_MAX = 1024
 
 # Grams per 1 US cup for common ingredients (used for volume -> weight).
 DENSITY_G_PER_CUP = {
@@ -288,284 +385,83 @@ KNOWN_KCAL_PER_100G = {
 }
 
 # ---------------------------------------------------------------------------
-# Backend functions
+# Table matchers
 # ---------------------------------------------------------------------------
 
 
-def _fallback_scrape_html(html):
-    """Extract recipe data from plain HTML when no Recipe schema is found.
-
-    Looks for ingredient-like <li> elements (lines starting with a number,
-    fraction, or common quantity word) and extracts the title from <h1>.
-    """
-    soup = BeautifulSoup(html, "html.parser")
-
-    # Remove comment sections so they don't pollute instruction extraction.
-    for el in soup.find_all(id=re.compile(r"comment|respond|reply|discussion", re.I)):
-        el.decompose()
-    for el in soup.find_all(class_=re.compile(r"comment|respond|reply|discussion", re.I)):
-        el.decompose()
-
-    # Prefer <title> (strip common " — Site Name" / " | Site Name" suffixes),
-    # then fall back to the first <h1> or <h2>.
-    title = None
-    title_tag = soup.find("title")
-    if title_tag:
-        raw_title = title_tag.get_text(strip=True)
-        # Strip trailing " — Site", " | Site", " - Site" suffixes
-        title = re.split(r"\s*(?:\u2014|\||[-\u2013])\s*(?!.*(?:\u2014|\||[-\u2013]))", raw_title, maxsplit=1)[0].strip()
-    if not title:
-        for tag_name in ("h1", "h2"):
-            tag = soup.find(tag_name)
-            if tag:
-                title = tag.get_text(strip=True)
-                break
-    if not title:
-        title = "Unknown Recipe"
-
-    # Gather all <li> text and keep those that look like ingredients
-    _ingredient_re = re.compile(
-        r"^[\d\u00BC-\u00BE\u2150-\u215E]"  # starts with digit or unicode fraction
-        r"|^(a |one |two |three |four |half )",  # or common quantity words
-        re.IGNORECASE,
-    )
-    ingredients = []
-    for li in soup.find_all("li"):
-        text = li.get_text(" ", strip=True)
-        if text and _ingredient_re.search(text):
-            ingredients.append(text)
-
-    # Also try <p> tags with <br>-separated lines (some sites like Smitten
-    # Kitchen put ingredients in a single <p> with <br> instead of <li>).
-    # If this finds more ingredient-like lines, prefer it over the <li> scan.
-    best_p_lines = []
-    for p_tag in soup.find_all("p"):
-        brs = p_tag.find_all("br")
-        if len(brs) < 2:
-            continue
-        lines = [s.strip() for s in p_tag.stripped_strings if s.strip()]
-        matches = [l for l in lines if _ingredient_re.search(l)]
-        if len(matches) > len(best_p_lines):
-            best_p_lines = matches
-    if len(best_p_lines) > len(ingredients):
-        ingredients = best_p_lines
-
-    # Look for a servings mention near the recipe
-    servings_text = None
-    for tag in soup.find_all(string=re.compile(r"serv|portion|yield", re.IGNORECASE)):
-        match = re.search(r"(\d+)\s*(?:servings?|portions?)", tag, re.IGNORECASE)
-        if match:
-            servings_text = match.group(0)
-            break
-
-    # Extract instructions: look for <ol> with multiple <li>, or long <p> blocks
-    # that read like preparation steps (sentences, not ingredient lines).
-    instructions = []
-    # Strategy 1: ordered list items (most structured recipe sites)
-    for ol in soup.find_all("ol"):
-        items = [li.get_text(" ", strip=True) for li in ol.find_all("li")]
-        if len(items) > len(instructions):
-            instructions = items
-    # Strategy 2: <p> tags that look like imperative cooking steps.
-    # To avoid blog headnotes/prose, require the sentence (or a sub-heading
-    # prefix like "Make filling:") to START with a cooking verb.
-    if not instructions:
-        # Step prefix like "Make lids:", "Prepare sauce:", "For the crust:" — strong signal
-        _step_prefix_re = re.compile(
-            r"^(?:make|prepare|assemble|for\s+the)\s+[\w\s]+:", re.IGNORECASE,
-        )
-        # Imperative cooking verb near the start of the sentence
-        _step_start_re = re.compile(
-            r"^(?:\w+\s+){0,4}"  # up to 4 leading words
-            r"(heat|preheat|cook|bake|stir|add|combine|mix|whisk|fold|place|"
-            r"pour|bring|simmer|boil|reduce|remove|let|set|serve|season|toss|"
-            r"transfer|cover|drain|slice|chop|cut|spread|layer|roll|brush|"
-            r"divide|arrange|wipe|melt|assemble|prepare|rinse|pat|rub|"
-            r"line|grease|soak|knead|shape|form|trim|score|tent|rest|"
-            r"once|when|after|meanwhile)\b",
-            re.IGNORECASE,
-        )
-        # Prefer content area (entry-content, post-content) to avoid sidebar prose
-        content_area = (
-            soup.find(class_=re.compile(r"entry-content|post-content|recipe-body", re.I))
-            or soup
-        )
-        for p_tag in content_area.find_all("p"):
-            text = p_tag.get_text(" ", strip=True)
-            if len(text) > 30 and not _ingredient_re.search(text):
-                if _step_prefix_re.search(text) or _step_start_re.search(text):
-                    instructions.append(text)
-
-    return title, servings_text, ingredients, instructions
-
-
-# Matches common measurement units and food words — used to distinguish real
-# ingredients from garbage scraped off non-recipe pages.
-_RECIPE_SIGNAL_RE = re.compile(
-    r"\b(cups?|tbsp|tablespoons?|tsp|teaspoons?|oz|ounces?|pounds?|lbs?|"
-    r"grams?|kg|ml|liters?|pinch|dash|cloves?|slices?|cans?|bunch|sprigs?|"
-    r"heads?|stalks?|"
-    r"flour|sugar|salt|butter|oil|eggs?|milk|cream|water|chicken|beef|pork|"
-    r"onions?|garlic|pepper|cheese|rice|pasta|sauce|broth|stock|vinegar|"
-    r"baking|vanilla|cinnamon|cumin|paprika|oregano|basil|thyme|"
-    r"lemon|tomato|potato|carrot|celery|mushroom|honey|soy|ginger)\b",
-    re.IGNORECASE,
-)
-
-
-def validate_recipe_data(ingredients, instructions, scraper_tier):
-    """Check that scraped data looks like a real recipe.
+class _KeyMatcher:
+    """Finds the longest table key contained in a string, in one regex pass.
 
-    Tier 1/2 (JSON-LD schema) are trusted. Tier 3 (regex fallback) gets
-    heuristic checks for food/measurement words.
-
-    Raises ValueError with a user-friendly message if validation fails.
+    The keys are compiled into a single trie-shaped pattern inside a lookahead,
+    so every start position reports the longest key that matches there and
+    the cost doesn't grow with the number of keys. Ties between equally long
+    keys go to the one listed first in the table, same as a loop over the dict.
     """
-    if not ingredients and not instructions:
-        raise ValueError(
-            "No recipe found on this page. Try pasting a URL from a recipe website."
-        )
-
-    if scraper_tier in (1, 2):
-        return  # page declared Recipe schema — trust it
-
-    # Tier 3: require at least 2 ingredients with food/measurement signal
-    if len(ingredients) < 2:
-        raise ValueError(
-            "This page doesn't appear to contain a recipe. "
-            "Try pasting a URL from a recipe website."
-        )
-
-    if not any(_RECIPE_SIGNAL_RE.search(ing) for ing in ingredients):
-        raise ValueError(
-            "This page doesn't appear to contain a recipe. "
-            "Try pasting a URL from a recipe website."
-        )
-
-
-def scrape_recipe(url):
-    """Fetch and parse a recipe from a URL.
-
-    Returns dict with title, servings (int), and ingredients (list of str).
-    """
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate",
-        "Connection": "keep-alive",
-        "Upgrade-Insecure-Requests": "1",
-    }
-    resp = requests.get(url, headers=headers, timeout=15)
-    if resp.status_code in (403, 500):
-        # Anti-bot protected site — retry with cloudscraper
-        scraper_session = cloudscraper.create_scraper()
-        resp = scraper_session.get(url, timeout=15)
-    # Some sites return 500 but still send full HTML with recipe data
-    if resp.status_code != 500 or len(resp.text) < 1000:
-        resp.raise_for_status()
-
-    scraper_tier = 3
-    try:
-        scraper = scrape_html(resp.text, org_url=url)
-        scraper_tier = 1
-    except Exception:
-        try:
-            # Site not directly supported - try generic mode (reads JSON-LD / microdata)
-            scraper = scrape_html(resp.text, org_url=url, supported_only=False)
-            scraper_tier = 2
-        except Exception:
-            scraper = None
-
-    title = ingredients = yields_str = None
-    if scraper:
-        try:
-            title = scraper.title()
-            yields_str = scraper.yields()
-            ingredients = scraper.ingredients()
-        except Exception:
-            scraper = None
-
-    if not scraper or not ingredients:
-        # No schema found — fall back to plain HTML extraction
-        scraper_tier = 3
-        title, yields_str, ingredients, _instructions = _fallback_scrape_html(resp.text)
-
-    validate_recipe_data(ingredients or [], [], scraper_tier)
-
-    servings = _parse_servings(yields_str)
-
-    return {
-        "title": title,
-        "servings": servings,
-        "ingredients": ingredients,
-    }
-
-
-def _parse_servings(yields_str):
-    """Extract an integer serving count from strings like '24 servings'."""
-    if not yields_str:
-        return None
-    match = re.search(r"(\d+)", str(yields_str))
-    return int(match.group(1)) if match else None
-
 
-def _simplify_alternatives(raw):
-    """Simplify 'A or B' ingredient alternatives to just the first option.
+    def __init__(self, keys, word_boundary=True):
+        self.order = {key: i for i, key in enumerate(keys)}
+        body = self._trie_pattern(self.order)
+        if word_boundary:
+            body = r"\b" + body + r"\b"
+        self.pattern = re.compile("(?=" + body + ")")
+
+    @staticmethod
+    def _trie_pattern(keys):
+        trie = {}
+        for key in keys:
+            node = trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+
+        def build(node):
+            branches = [re.escape(ch) + build(child) for ch, child in node.items() if ch]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            # A key may end here: make the rest optional. Greedy, so the
+            # longer continuation is tried first.
+            return "(?:" + body + ")?" if "" in node else body
+
+        return "(" + build(trie) + ")"
+
+    def longest(self, text):
+        """Return the longest key found in text, or None."""
+        best = None
+        for m in self.pattern.finditer(text):
+            key = m.group(1)
+            if best is None or len(key) > len(best) or (
+                len(key) == len(best) and self.order[key] < self.order[best]
+            ):
+                best = key
+        return best
+
+
+_DENSITY_MATCHER = _KeyMatcher(DENSITY_G_PER_CUP)
+_KNOWN_KCAL_MATCHER = _KeyMatcher(KNOWN_KCAL_PER_100G)
+# Item weights match as plain substrings ("onion" in "red onions")
+_ITEM_WEIGHT_MATCHER = _KeyMatcher(WEIGHT_PER_ITEM, word_boundary=False)
+
+# Everything besides the page that decides a calculate_recipe() result, so
+# editing a table or upgrading a parser retires old cached results by itself
+_RESULT_FINGERPRINT = hashlib.sha256(json.dumps([
+    RESULT_CACHE_VERSION,
+    DENSITY_G_PER_CUP,
+    WEIGHT_PER_ITEM,
+    KNOWN_KCAL_PER_100G,
+    INGREDIENT_PARSER_VERSION,
+    NORMALIZATION_VERSION,
+    RECIPE_SCRAPERS_VERSION,
+    USDA_LOCAL_DB or USDA_BASE,
+], sort_keys=True).encode("utf-8")).hexdigest()[:16]
+_RESULT_DISK_CACHE = (
+    DiskCache(RESULT_CACHE_DB, f"results-{_RESULT_FINGERPRINT}", RESULT_CACHE_DB_MAX_ENTRIES)
+    if RESULT_CACHE_DB else None
+)
 
-    '2 large or 3 medium carrots' -> '2 large carrots'
-    '1 cup milk or cream' -> '1 cup milk' (already handled by name cleaning)
-    """
-    # Match: "NUMBER [words] or NUMBER [words] INGREDIENT"
-    match = re.match(
-        r"^(\d[\d/.\s]*\S+)\s+or\s+\d[\d/.\s]*\S+\s+(.+)$", raw, re.IGNORECASE
-    )
-    if match:
-        return f"{match.group(1)} {match.group(2)}"
-    return raw
-
-
-UNIT_NORMALIZATIONS = [
-    (r"\blb's\b", "lbs"),
-    (r"\boz's\b", "oz"),
-    (r"\btblsp\b", "tbsp"),
-    (r"\btbls\b", "tbsp"),
-    (r"\btsps?\.\b", "tsp"),
-    (r"\btbsps?\.\b", "tbsp"),
-]
-
-
-def _normalize_raw_ingredient(raw):
-    """Fix common unit typos/variants before parsing."""
-    # Normalize smart quotes/curly apostrophes to plain apostrophe
-    result = raw.replace("\u2019", "'").replace("\u2018", "'")
-    # Fix broken hyphens from HTML line-breaks: "sodium- free" → "sodium-free"
-    result = re.sub(r"(\w)- (\w)", r"\1-\2", result)
-    for pattern, replacement in UNIT_NORMALIZATIONS:
-        result = re.sub(pattern, replacement, result, flags=re.IGNORECASE)
-    # Strip parenthetical conversion notes: "(115 grams or 3/4 cup)" etc.
-    result = re.sub(
-        r"\s*\([^)]*(?:grams?|oz|ounces?|cups?|ml|liters?|litres?|lbs?|pounds?|kg|inch|inches|cm)\b[^)]*\)",
-        "", result, flags=re.IGNORECASE,
-    )
-    result = re.sub(r"  +", " ", result).strip()
-    # "1 x 400g can ..." → "400g ..."  (multiply out the N × weight)
-    match = re.match(
-        r"^(\d+)\s*x\s*(\d+)\s*(g|kg|oz|lb|lbs|ml|l)\b\s*(?:can|cans|tin|tins|bag|bags|box|boxes|packet|packets|package|packages|jar|jars|bottle|bottles|carton|cartons|pouch|pouches)?\s*(.*)$",
-        result,
-        re.IGNORECASE,
-    )
-    if match:
-        multiplier = int(match.group(1))
-        weight = int(match.group(2)) * multiplier
-        unit = match.group(3)
-        rest = match.group(4)
-        result = f"{weight} {unit} {rest}".strip()
-    # "1 extra-large (about 2 1/2 cups onion, diced)" → "2 1/2 cups onion, diced"
-    match = re.match(r"^\d[\d\s/]*\S+\s+\(about\s+(.+)\)\s*$", result, re.IGNORECASE)
-    if match:
-        result = match.group(1)
-    return result
+# ---------------------------------------------------------------------------
+# Backend functions
+# ---------------------------------------------------------------------------
 
 
 def parse_ingredient_string(raw):
@@ -574,12 +470,49 @@ def parse_ingredient_string(raw):
     Returns dict with keys: raw, name, amounts (list of (quantity, unit) tuples).
     Handles both simple amounts and composite amounts like "2 cups plus 2 tbsp".
     """
-    simplified = _simplify_alternatives(raw)
-    normalized = _normalize_raw_ingredient(simplified)
-    try:
-        result = parse_ingredient(normalized)
-    except Exception:
-        return {"raw": raw, "name": raw, "size": None, "amounts": []}
+    return parse_ingredient_list([raw])[0]
+
+
+def parse_ingredient_list(raws):
+    """Parse a recipe's full ingredient list in one call.
+
+    Lines already in the parse memo are served from it. The rest are
+    normalized together and each distinct normalized line goes through the
+    parser model once ("1 tsp salt" listed for both dough and filling is
+    parsed once). Returns parse_ingredient_string-style dicts in input order;
+    amounts is a tuple, since memoized entries are shared between callers.
+    """
+    results = [None] * len(raws)
+    pending = {}  # raw line -> indexes still to parse
+    for i, raw in enumerate(raws):
+        entry = _get_parse_entry(raw)
+        if entry is None:
+            pending.setdefault(raw, []).append(i)
+        else:
+            results[i] = _parsed_ingredient_dict(raw, entry)
+
+    if pending:
+        todo = list(pending)
+        normalized = normalize_ingredient_lines(todo, simplify=True)
+        parsed_lines = {}
+        for line in dict.fromkeys(normalized):
+            try:
+                parsed_lines[line] = parse_ingredient(line)
+            except Exception:
+                parsed_lines[line] = None
+        entries = {raw: _parse_entry(raw, parsed_lines[line]) for raw, line in zip(todo, normalized)}
+        # Failures (e.g. missing NLTK data) may be temporary, so only successes are kept
+        _set_parse_entries({raw: entries[raw] for raw, line in zip(todo, normalized) if parsed_lines[line] is not None})
+        for raw, entry in entries.items():
+            for i in pending[raw]:
+                results[i] = _parsed_ingredient_dict(raw, entry)
+    return results
+
+
+def _parse_entry(raw, result):
+    """Reduce a parser result (None on failure) to a (name, size, amounts) tuple."""
+    if result is None:
+        return raw, None, ()
 
     name = result.name[0].text if result.name else raw
     size = result.size.text.lower() if result.size else None
@@ -601,9 +534,58 @@ def parse_ingredient_string(raw):
                 except (ValueError, ZeroDivisionError):
                     pass
 
+    return name, size, tuple(amounts)
+
+
+def _parsed_ingredient_dict(raw, entry):
+    name, size, amounts = entry
     return {"raw": raw, "name": name, "size": size, "amounts": amounts}
 
 
+def _get_parse_entry(raw):
+    entry = _PARSE_CACHE.get(raw)
+    if entry is None and _PARSE_DISK_CACHE is not None:
+        stored = _PARSE_DISK_CACHE.get(raw)
+        if stored is not None:
+            name, size, amounts = stored
+            entry = (name, size, tuple((q, _load_unit(u, is_pint)) for q, u, is_pint in amounts))
+            _PARSE_CACHE.set(raw, entry)
+    return entry
+
+
+def _set_parse_entries(entries):
+    """Memoize {raw: entry}; the disk copy is written in one transaction."""
+    for raw, entry in entries.items():
+        _PARSE_CACHE.set(raw, entry)
+    if _PARSE_DISK_CACHE is not None:
+        _PARSE_DISK_CACHE.set_many(
+            (raw, [name, size, [[q, *_dump_unit(u)] for q, u in amounts]])
+            for raw, (name, size, amounts) in entries.items()
+        )
+
+
+def _dump_unit(unit):
+    """Return (stored form, is_pint): pint Units are stored by name."""
+    if unit is None or isinstance(unit, str):
+        return unit, False
+    return str(unit), True
+
+
+def _load_unit(unit, is_pint):
+    """Turn a unit name stored on disk back into a pint Unit where possible."""
+    if not is_pint:
+        return unit
+    try:
+        return UREG.Unit(unit)
+    except Exception:
+        return unit
+
+
+def parse_cache_stats():
+    """Hit/miss counters for the in-memory ingredient-line parse memo."""
+    return _PARSE_CACHE.stats()
+
+
 def _lookup_density(ingredient_name):
     """Find grams-per-ml for an ingredient using the density table.
 
@@ -613,35 +595,45 @@ def _lookup_density(ingredient_name):
 
     Returns grams per ml, or None if not found.
     """
-    name_lower = ingredient_name.lower()
-    best_key = None
-    best_len = 0
-    for key in DENSITY_G_PER_CUP:
-        if re.search(r"\b" + re.escape(key) + r"\b", name_lower):
-            if len(key) > best_len:
-                best_key = key
-                best_len = len(key)
+    best_key = _DENSITY_MATCHER.longest(ingredient_name.lower())
     if best_key is None:
         return None
     return DENSITY_G_PER_CUP[best_key] / ML_PER_CUP
 
 
-def _is_weight_unit(unit):
-    """Check if a pint Unit is a weight/mass unit."""
+def _resolve_unit(unit):
+    """Resolve a unit (string or pint Unit) to a plain conversion factor.
+
+    Returns ("mass", grams per unit), ("volume", ml per unit), or None for
+    anything pint doesn't know or can't turn into a mass or volume (e.g.
+    "can", "cloves"). Cached by name, so pint only runs the first time a unit
+    shows up. (Units from the parser's registry and ours compare unequal, so
+    they can't be cache keys themselves.)
+    """
+    key = unit.lower() if isinstance(unit, str) else ("pint", str(unit))
     try:
-        (1 * unit).to(UREG.gram)
-        return True
-    except (pint.DimensionalityError, Exception):
-        return False
+        return _UNIT_FACTORS[key]
+    except KeyError:
+        pass
+    resolved = _convert_unit_factor(unit)
+    if len(_UNIT_FACTORS) < _UNIT_FACTORS_MAX:
+        _UNIT_FACTORS[key] = resolved
+    return resolved
 
 
-def _is_volume_unit(unit):
-    """Check if a pint Unit is a volume unit."""
+def _convert_unit_factor(unit):
     try:
-        (1 * unit).to(UREG.milliliter)
-        return True
-    except (pint.DimensionalityError, Exception):
-        return False
+        pint_unit = UREG.parse_expression(unit.lower()) if isinstance(unit, str) else unit
+    except Exception:
+        return None
+    try:
+        return "mass", (1 * pint_unit).to(UREG.gram).magnitude
+    except Exception:
+        pass
+    try:
+        return "volume", (1 * pint_unit).to(UREG.milliliter).magnitude
+    except Exception:
+        return None
 
 
 def _lookup_item_weight(ingredient_name, size=None):
@@ -650,16 +642,9 @@ def _lookup_item_weight(ingredient_name, size=None):
     Prefers the longest matching key so "green onions" matches before "onion".
     Returns grams per item, or None if not found.
     """
-    name_lower = ingredient_name.lower()
-    best_key = None
-    best_len = 0
-    for key in WEIGHT_PER_ITEM:
-        # Only match if the table key appears inside the ingredient name
-        # (e.g., "onion" in "medium onion"), not the reverse
-        if key in name_lower:
-            if len(key) > best_len:
-                best_key = key
-                best_len = len(key)
+    # Only match if the table key appears inside the ingredient name
+    # (e.g., "onion" in "medium onion"), not the reverse
+    best_key = _ITEM_WEIGHT_MATCHER.longest(ingredient_name.lower())
     if best_key is None:
         return None
     value = WEIGHT_PER_ITEM[best_key]
@@ -680,25 +665,13 @@ def convert_to_grams(quantity, unit, ingredient_name, size=None):
             return round(quantity * item_g, 1), "estimated per-item weight"
         return None, "no unit (count-based ingredient)"
 
-    # Normalize unit to a pint Unit object (handles both strings and pint Units)
-    try:
-        if isinstance(unit, str):
-            pint_unit = UREG.parse_expression(unit.lower())
-        else:
-            pint_unit = unit
-    except Exception:
-        # Not a recognized unit (e.g., "can", "cloves", "piece")
-        item_g = _lookup_item_weight(ingredient_name, size)
-        if item_g is not None:
-            return round(quantity * item_g, 1), "estimated per-item weight"
-        return None, f"unrecognized unit: {unit}"
-
-    if _is_weight_unit(pint_unit):
-        grams = (quantity * pint_unit).to(UREG.gram).magnitude
-        return round(grams, 1), "weight conversion"
+    resolved = _resolve_unit(unit)
+    if resolved is not None:
+        kind, factor = resolved
+        if kind == "mass":
+            return round(quantity * factor, 1), "weight conversion"
 
-    if _is_volume_unit(pint_unit):
-        ml = (quantity * pint_unit).to(UREG.milliliter).magnitude
+        ml = quantity * factor
         density = _lookup_density(ingredient_name)
         if density is not None:
             grams = ml * density
@@ -708,13 +681,37 @@ def convert_to_grams(quantity, unit, ingredient_name, size=None):
             grams = ml * 1.0
             return round(grams, 1), "approximate (water density used)"
 
-    # Dimensionless or other — try per-item weight
+    # Unrecognized (e.g., "can", "cloves"), dimensionless or other — try per-item weight
     item_g = _lookup_item_weight(ingredient_name, size)
     if item_g is not None:
         return round(quantity * item_g, 1), "estimated per-item weight"
     return None, f"unrecognized unit: {unit}"
 
 
+# Trailing clauses cut from ingredient names before a USDA search
+_NAME_SPLITTERS = (" or ", " for ", " plus more", ", plus ")
+# Recipe adjectives that confuse USDA search, removed as whole words in
+# this order. Order matters: 'room temperature' and 'large' go before
+# 'at room temperature' and 'extra-large' can match, leaving 'at' / 'extra-'.
+_NAME_REMOVE_WORDS = (
+    "cold", "warm", "hot", "room temperature", "at room temperature",
+    "freshly", "fresh", "well-shaken", "well shaken",
+    "finely", "fine", "coarsely", "roughly", "thinly",
+    "unsalted", "salted", "softened", "melted", "frozen", "thawed",
+    "unbleached", "bleached", "sifted", "packed",
+    "large", "medium", "small", "extra-large",
+    "grated", "shredded", "chopped", "diced", "minced", "sliced",
+    # Dietary / label adjectives that obscure the base ingredient
+    "low-sodium", "sodium-free", "no-salt-added",
+    "low-fat", "reduced-fat", "full-fat", "nonfat", "fat-free",
+    "organic", "boneless", "skinless",
+)
+_NAME_REMOVE_PATTERNS = [(word, re.compile(r"\b" + re.escape(word) + r"\b")) for word in _NAME_REMOVE_WORDS]
+# Any removable word at all? Most names have none and skip the per-word passes.
+_NAME_REMOVE_GATE = re.compile("|".join(re.escape(word) for word in _NAME_REMOVE_WORDS))
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
 def _clean_ingredient_name(name):
     """Strip recipe jargon from an ingredient name for a better USDA search.
 
@@ -723,26 +720,16 @@ def _clean_ingredient_name(name):
     """
     cleaned = name.lower()
     # Remove everything after "or ", "for ", "plus more"
-    for splitter in [" or ", " for ", " plus more", ", plus "]:
+    for splitter in _NAME_SPLITTERS:
         cleaned = cleaned.split(splitter)[0]
-    # Remove common recipe adjectives that confuse USDA search
-    remove_words = [
-        "cold", "warm", "hot", "room temperature", "at room temperature",
-        "freshly", "fresh", "well-shaken", "well shaken",
-        "finely", "fine", "coarsely", "roughly", "thinly",
-        "unsalted", "salted", "softened", "melted", "frozen", "thawed",
-        "unbleached", "bleached", "sifted", "packed",
-        "large", "medium", "small", "extra-large",
-        "grated", "shredded", "chopped", "diced", "minced", "sliced",
-        # Dietary / label adjectives that obscure the base ingredient
-        "low-sodium", "sodium-free", "no-salt-added",
-        "low-fat", "reduced-fat", "full-fat", "nonfat", "fat-free",
-        "organic", "boneless", "skinless",
-    ]
-    for word in remove_words:
-        cleaned = re.sub(r"\b" + re.escape(word) + r"\b", "", cleaned)
+    # A word can only be removed if it's still a substring, so skipping the
+    # others gives the same result as running every pattern in order
+    if _NAME_REMOVE_GATE.search(cleaned):
+        for word, pattern in _NAME_REMOVE_PATTERNS:
+            if word in cleaned:
+                cleaned = pattern.sub("", cleaned)
     # Collapse whitespace and strip
-    cleaned = re.sub(r"\s+", " ", cleaned).strip(" ,")
+    cleaned = _WHITESPACE_RE.sub(" ", cleaned).strip(" ,")
     return cleaned
 
 
@@ -770,13 +757,7 @@ def _check_known_calories(name):
     if name_lower in KNOWN_KCAL_PER_100G:
         return KNOWN_KCAL_PER_100G[name_lower], f"{name} (built-in value)"
     # Word-boundary match, prefer longest key
-    best_key = None
-    best_len = 0
-    for key, kcal in KNOWN_KCAL_PER_100G.items():
-        if re.search(r"\b" + re.escape(key) + r"\b", name_lower):
-            if len(key) > best_len:
-                best_key = key
-                best_len = len(key)
+    best_key = _KNOWN_KCAL_MATCHER.longest(name_lower)
     if best_key is not None:
         return KNOWN_KCAL_PER_100G[best_key], f"{best_key} (built-in value)"
     return None, None
@@ -785,6 +766,12 @@ def _check_known_calories(name):
 def search_usda_calories(ingredient_name, api_key):
     """Search the USDA FoodData Central API for calorie info.
 
+    Uses the local FoodData Central store instead when USDA_LOCAL_DB is set
+    (see api/fdc_local.py). Results are cached per cleaned name (see USDA_CACHE_*), including misses,
+    and names in the bundled snapshot (USDA_SNAPSHOT) never reach the API. Concurrent
+    lookups of one name share a single request, and API calls draw on the host's
+    hourly budget (see USDA_BUDGET_*); when it or the API's own limit runs out the
+    lookup returns a stale cached result or (None, reason) rather than raising.
     Returns (kcal_per_100g, matched_food_name) or (None, reason_string).
     """
     cleaned = _clean_ingredient_name(ingredient_name)
@@ -794,56 +781,97 @@ def search_usda_calories(ingredient_name, api_key):
     if known_kcal is not None:
         return known_kcal, known_desc
 
-    url = f"{USDA_BASE}/foods/search"
-    params = {
-        "api_key": api_key,
-        "query": cleaned,
-        "dataType": "SR Legacy,Foundation",
-        "pageSize": 5,
-    }
-    resp = requests.get(url, params=params, timeout=10)
-
-    if resp.status_code == 403:
-        raise ValueError("Invalid USDA API key. Please check your key.")
-    if resp.status_code == 429:
-        raise ValueError("USDA API rate limit reached (1000/hour). Try again later.")
-    if resp.status_code == 400:
-        return None, "USDA search failed (bad query)"
-    if not resp.ok:
-        return None, f"USDA API error (HTTP {resp.status_code})"
-
-    data = resp.json()
-    foods = data.get("foods", [])
+    cached = _USDA_CACHE.get(cleaned)
+    if cached is not None:
+        return cached
+
+    snapshot = _USDA_SNAPSHOT.get(cleaned) if _USDA_SNAPSHOT is not None else None
+    if snapshot is not None:
+        kcal, description = snapshot
+        return (float(kcal) if kcal else None), description
+
+    return _USDA_FLIGHTS.do(cleaned, lambda: _lookup_usda(cleaned, api_key))
+
+
+# Reasons _lookup_usda() gives for misses it doesn't cache; a recipe with
+# one of these isn't cached whole either
+_UNCACHED_MISS_REASONS = ("not looked up", "USDA API error")
+
+
+def _rate_limited(cleaned, reason):
+    """Fallback when the USDA budget is spent: an expired cached answer if there is one."""
+    stale = _USDA_CACHE.get_stale(cleaned)
+    return stale if stale is not None else (None, reason)
+
+
+def _lookup_usda(cleaned, api_key):
+    """One USDA search (or local store query) for a cleaned name, cached."""
+    # A flight that finished just before this one started may have filled it
+    cached = _USDA_CACHE.get(cleaned)
+    if cached is not None:
+        return cached
+
+    if USDA_LOCAL_DB:
+        # Offline FoodData Central store — same datasets and page size
+        foods = search_local_foods(USDA_LOCAL_DB, cleaned, limit=5)
+    else:
+        url = f"{USDA_BASE}/foods/search"
+        params = {
+            "api_key": api_key,
+            "query": cleaned,
+            "dataType": "SR Legacy,Foundation",
+            "pageSize": 5,
+        }
+        if _USDA_BUDGET is not None and not _USDA_BUDGET.acquire(USDA_BUDGET_MAX_WAIT):
+            return _rate_limited(cleaned, "not looked up: USDA hourly request budget used up")
+        resp = USDA_SESSION.get(url, params=params, timeout=10)
+        if _USDA_BUDGET is not None:
+            _USDA_BUDGET.observe(resp.headers.get("X-RateLimit-Remaining"))
+
+        if resp.status_code == 403:
+            raise ValueError("Invalid USDA API key. Please check your key.")
+        if resp.status_code == 429:
+            if _USDA_BUDGET is not None:
+                _USDA_BUDGET.drain()
+            return _rate_limited(cleaned, "not looked up: USDA API rate limit reached (1000/hour)")
+        if resp.status_code == 400:
+            result = (None, "USDA search failed (bad query)")
+            _USDA_CACHE.set(cleaned, result, negative=True)
+            return result
+        if not resp.ok:
+            # Transient server error — don't cache, the next request may succeed
+            return None, f"USDA API error (HTTP {resp.status_code})"
+
+        data = resp.json()
+        foods = data.get("foods", [])
 
     if not foods:
-        return None, "not found in USDA database"
+        result = (None, "not found in USDA database")
+    else:
+        result = (None, "energy data missing from USDA result")
+        # Check all returned foods for one with energy data
+        for food in foods:
+            kcal = _extract_energy_kcal(food)
+            if kcal is not None:
+                result = (kcal, food["description"])
+                break
+
+    _USDA_CACHE.set(cleaned, result, negative=result[0] is None)
+    return result
 
-    # Check all returned foods for one with energy data
-    for food in foods:
-        kcal = _extract_energy_kcal(food)
-        if kcal is not None:
-            return kcal, food["description"]
 
-    return None, "energy data missing from USDA result"
+def usda_cache_stats():
+    """Hit/miss counters for the USDA lookup cache, plus shared in-flight lookups."""
+    return {**_USDA_CACHE.stats(), "flights": _USDA_FLIGHTS.stats()}
 
 
 def calculate_ingredient_calories(parsed, api_key):
     """Full pipeline for one ingredient: parse -> convert -> lookup -> compute."""
-    result = {
-        "raw": parsed["raw"],
-        "name": parsed["name"],
-        "amounts": parsed["amounts"],
-        "grams": None,
-        "kcal_per_100g": None,
-        "total_kcal": None,
-        "usda_match": None,
-        "status": "ok",
-        "note": "",
-    }
+    result = IngredientResult(parsed["raw"], parsed["name"], parsed["amounts"])
 
     if not parsed["amounts"]:
-        result["status"] = "skipped"
-        result["note"] = "no quantity found"
+        result.status = "skipped"
+        result.note = "no quantity found"
         return result
 
     # Convert all amounts to grams and sum them.
@@ -863,50 +891,421 @@ def calculate_ingredient_calories(parsed, api_key):
             notes.append(method)
 
     if not converted_any:
-        result["status"] = "skipped"
-        result["note"] = "could not convert any amounts to grams"
+        result.status = "skipped"
+        result.note = "could not convert any amounts to grams"
         return result
 
-    result["grams"] = round(total_grams, 1)
+    result.grams = round(total_grams, 1)
     if notes:
-        result["note"] = notes[0]
+        result.note = notes[0]
 
-    kcal_per_100g, usda_match = search_usda_calories(parsed["name"], api_key)
+    with span("usda", parsed["name"]):
+        kcal_per_100g, usda_match = search_usda_calories(parsed["name"], api_key)
 
     if kcal_per_100g is None:
-        result["status"] = "not found"
-        result["note"] = usda_match
+        result.status = "not found"
+        result.note = usda_match
         return result
 
-    result["kcal_per_100g"] = round(kcal_per_100g, 1)
-    result["total_kcal"] = round((total_grams / 100.0) * kcal_per_100g, 1)
-    result["usda_match"] = usda_match
+    result.kcal_per_100g = round(kcal_per_100g, 1)
+    result.total_kcal = round((total_grams / 100.0) * kcal_per_100g, 1)
+    result.usda_match = usda_match
     return result
 
 
-def calculate_recipe(url, api_key, progress_callback=None):
-    """Top-level function: scrape URL, calculate calories for all ingredients."""
-    recipe = scrape_recipe(url)
-    ingredients_raw = recipe["ingredients"]
-    total = len(ingredients_raw)
+def _group_by_name(parsed_all):
+    """Group parsed-ingredient indexes by cleaned name.
+
+    Each group is looked up by one worker, so duplicates never race to
+    USDA: the first lookup fills the cache and the rest hit it.
+    """
+    groups = {}
+    for i, parsed in enumerate(parsed_all):
+        groups.setdefault(_clean_ingredient_name(parsed["name"]), []).append(i)
+    return list(groups.values())
+
+
+def _calculate_group(parsed_all, indexes, api_key):
     results = []
+    for i in indexes:
+        with span("ingredient", parsed_all[i]["raw"]):
+            results.append((i, calculate_ingredient_calories(parsed_all[i], api_key)))
+    return results
 
-    for i, raw in enumerate(ingredients_raw):
-        if progress_callback:
-            progress_callback(i + 1, total, raw[:60])
 
-        parsed = parse_ingredient_string(raw)
-        result = calculate_ingredient_calories(parsed, api_key)
-        results.append(result)
+def _recipe_totals(servings, results):
+    """Return (total_kcal, per_serving) for a recipe's ingredient results."""
+    total_kcal = sum(r.total_kcal for r in results if r.total_kcal)
+    per_serving = round(total_kcal / servings, 1) if servings else None
+    return round(total_kcal, 1), per_serving
+
 
-    total_kcal = sum(r["total_kcal"] for r in results if r["total_kcal"])
+def iter_recipe_calories(url, api_key, max_workers=None, extracted=None):
+    """Scrape URL and yield its calorie breakdown as each piece is ready.
+
+    Yields event dicts, tagged by "type":
+      recipe      title, servings and ingredient_count, once scraping is done
+      ingredient  index and ingredient (the IngredientResult from
+                  calculate_ingredient_calories()), in completion order
+      totals      total_kcal and per_serving, after the last ingredient
+
+    Ingredients are looked up concurrently (see _iter_ingredient_results).
+    Scraping errors are raised before the first event. Pass extracted (an
+    extract_recipe() result) when the page is already in hand.
+    """
+    recipe = scrape_recipe(url, extracted)
+    ingredients_raw = recipe["ingredients"]
+    with span("parse"):
+        parsed_all = parse_ingredient_list(ingredients_raw)
     servings = recipe["servings"]
-    per_serving = round(total_kcal / servings, 1) if servings else None
 
-    return {
+    yield {
+        "type": "recipe",
         "title": recipe["title"],
         "servings": servings,
-        "total_kcal": round(total_kcal, 1),
-        "per_serving": per_serving,
-        "ingredients": results,
+        "ingredient_count": len(ingredients_raw),
     }
+
+    results = [None] * len(parsed_all)
+    for i, result in _iter_ingredient_results(parsed_all, api_key, max_workers):
+        results[i] = result
+        yield {"type": "ingredient", "index": i, "ingredient": result}
+
+    total_kcal, per_serving = _recipe_totals(servings, results)
+    yield {"type": "totals", "total_kcal": total_kcal, "per_serving": per_serving}
+
+
+def _iter_ingredient_results(parsed_all, api_key, max_workers=None):
+    """Yield (index, calculate_ingredient_calories() result) in completion order.
+
+    Looks up concurrently (up to max_workers, default USDA_MAX_WORKERS), one
+    worker per cleaned name (see _group_by_name).
+    """
+    groups = _group_by_name(parsed_all)
+    workers = max(1, min(max_workers or USDA_MAX_WORKERS, len(groups) or 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [submit(pool, _calculate_group, parsed_all, indexes, api_key) for indexes in groups]
+        try:
+            for future in as_completed(futures):
+                yield from future.result()
+        finally:
+            # Closed early (e.g. the client went away): skip lookups not started yet
+            for future in futures:
+                future.cancel()
+
+
+def _reusable_ingredient(ingredient):
+    """Whether an ingredient result sent back by a client can stand in for a fresh one.
+
+    Misses from a transient USDA problem are looked up again, as
+    _cacheable_result() keeps them out of the result cache.
+    """
+    if not isinstance(ingredient, dict) or not isinstance(ingredient.get("raw"), str):
+        return False
+    note = ingredient.get("note")
+    if ingredient.get("status") == "not found" and isinstance(note, str) and note.startswith(_UNCACHED_MISS_REASONS):
+        return False
+    return ingredient.get("total_kcal") is None or type(ingredient["total_kcal"]) in (int, float)
+
+
+def calculate_from_lines(lines, api_key, title=None, servings=None, previous=None, max_workers=None):
+    """Calculate calories for ingredient lines given directly, with no page to fetch.
+
+    Returns a RecipeResult, like calculate_recipe(). previous is the ingredient list of
+    an earlier result, as the client received it: a line whose text is
+    unchanged reuses its entry from there, so editing one line parses and
+    looks up only that line.
+    """
+    reusable = {}
+    for ingredient in previous or ():
+        if _reusable_ingredient(ingredient):
+            reusable.setdefault(ingredient["raw"], ingredient)
+
+    results = [None] * len(lines)
+    todo = []
+    for i, line in enumerate(lines):
+        if line in reusable:
+            results[i] = IngredientResult.from_wire(reusable[line])
+        else:
+            todo.append(i)
+
+    if todo:
+        with span("parse"):
+            parsed_all = parse_ingredient_list([lines[i] for i in todo])
+        for j, result in _iter_ingredient_results(parsed_all, api_key, max_workers):
+            results[todo[j]] = result
+
+    total_kcal, per_serving = _recipe_totals(servings, results)
+    return RecipeResult(title, servings, total_kcal, per_serving, results)
+
+
+def _recipe_key(url):
+    """The URL as it identifies a recipe: case-folded host, no fragment or tracking parameters."""
+    parts = urlsplit(url.strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _TRACKING_PARAMS.match(k)]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", urlencode(query), ""))
+
+
+def _copy_recipe(result):
+    # The shared result stays cached; callers may change their copy
+    return result.copy()
+
+
+def calculate_recipe(url, api_key, progress_callback=None, max_workers=None):
+    """Top-level function: scrape URL, calculate calories for all ingredients.
+
+    Collects iter_recipe_calories() into one RecipeResult (api/records.py).
+    Ingredients keep the original order; progress_callback(done, total, raw)
+    fires as each finishes.
+
+    Concurrent calls for the same recipe (see _recipe_key) wait on one
+    calculation, and a result finished within RECIPE_COALESCE_GRACE seconds
+    is reused; every caller gets its own copy. Calls with a progress_callback
+    always run their own. Past that, a page whose HTML hasn't changed gets
+    its cached result (see RESULT_CACHE_*) without being scraped again.
+    """
+    if progress_callback is not None:
+        return _copy_recipe(_calculate_recipe(url, api_key, progress_callback, max_workers))
+
+    key = _recipe_key(url)
+    result = _RECENT_RECIPES.get(key)
+    if result is None:
+        def run():
+            fresh = _calculate_recipe(url, api_key, None, max_workers)
+            _RECENT_RECIPES.set(key, fresh)
+            return fresh
+
+        result = _RECIPE_FLIGHTS.do(key, run)
+        if result is None:
+            # Led by a stream whose client went away before it finished
+            result = run()
+    return _copy_recipe(result)
+
+
+def stream_recipe_calories(url, api_key, max_workers=None):
+    """iter_recipe_calories() with calculate_recipe()'s sharing, for streamed responses.
+
+    A result calculate_recipe() would reuse (recent, in flight, or cached
+    for unchanged HTML) is replayed as the same events in recipe order,
+    without USDA lookups; otherwise the live events are yielded and their
+    result kept for the calls after it. Replayed ingredients are shared,
+    so don't change them.
+    """
+    key = _recipe_key(url)
+    result = _RECENT_RECIPES.get(key)
+    if result is None:
+        flight, leader = _RECIPE_FLIGHTS.claim(key)
+        if leader:
+            yield from _lead_stream(key, flight, url, api_key, max_workers)
+            return
+        result = flight.wait()
+        if result is None:
+            yield from _recipe_events(url, api_key, max_workers)
+            return
+    yield from _replay_events(result)
+
+
+def _lead_stream(key, flight, url, api_key, max_workers):
+    """Run a streamed calculation on its own thread, yielding its events as they arrive.
+
+    The flight lands as soon as the calculation finishes, so callers waiting
+    on it don't also wait for this stream's client to read everything.
+    Closing the stream stops the calculation; the flight then lands with no
+    result and waiters run their own.
+    """
+    events = queue.SimpleQueue()
+    stop = threading.Event()
+    failed = []
+
+    def run():
+        result = error = None
+        calculation = _recipe_events(url, api_key, max_workers)
+        try:
+            while not stop.is_set():
+                try:
+                    events.put(next(calculation))
+                except StopIteration as finished:
+                    result = finished.value
+                    _RECENT_RECIPES.set(key, result)
+                    break
+        except Exception as e:
+            error = e
+            failed.append(e)
+        finally:
+            calculation.close()
+            _RECIPE_FLIGHTS.land(key, flight, result, error)
+            events.put(None)
+
+    worker = threading.Thread(target=contextvars.copy_context().run, args=(run,), daemon=True)
+    worker.start()
+    try:
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            yield event
+    finally:
+        stop.set()
+        worker.join()
+    if failed:
+        raise failed[0]
+
+
+def _replay_events(result):
+    """iter_recipe_calories() events for a finished result."""
+    yield {
+        "type": "recipe",
+        "title": result.title,
+        "servings": result.servings,
+        "ingredient_count": len(result.ingredients),
+    }
+    for i, ingredient in enumerate(result.ingredients):
+        yield {"type": "ingredient", "index": i, "ingredient": ingredient}
+    yield {"type": "totals", "total_kcal": result.total_kcal, "per_serving": result.per_serving}
+
+
+def _result_cache_key(url, page_hash):
+    return f"{_recipe_key(url)} {page_hash}"
+
+
+def _cacheable_result(result):
+    """Whether a result is worth caching: no ingredient was left unresolved by a transient USDA problem."""
+    return not any(
+        ingredient.status == "not found" and ingredient.note.startswith(_UNCACHED_MISS_REASONS)
+        for ingredient in result.ingredients
+    )
+
+
+def _get_cached_result(key):
+    result = _RESULT_CACHE.get(key)
+    if result is None and _RESULT_DISK_CACHE is not None:
+        stored = _RESULT_DISK_CACHE.get(key)
+        if stored is not None and stored["expires"] > time.time():
+            recipe = stored["result"]
+            ingredients = [
+                IngredientResult(**{
+                    **ingredient,
+                    "amounts": tuple((q, _load_unit(u, is_pint)) for q, u, is_pint in ingredient["amounts"]),
+                })
+                for ingredient in recipe["ingredients"]
+            ]
+            result = RecipeResult(recipe["title"], recipe["servings"], recipe["total_kcal"], recipe["per_serving"], ingredients)
+            # Keep the disk entry's expiry rather than starting a fresh TTL
+            _RESULT_CACHE.set(key, result, negative=stored["negative"], ttl=stored["expires"] - time.time())
+    return result
+
+
+def _set_cached_result(key, result):
+    # Results with misses expire with the USDA misses they're built on
+    negative = any(ingredient.status == "not found" for ingredient in result.ingredients)
+    _RESULT_CACHE.set(key, result, negative=negative)
+    if _RESULT_DISK_CACHE is not None:
+        stored = result.to_wire()
+        stored["ingredients"] = [
+            {**ingredient.to_wire(), "amounts": [[q, *_dump_unit(u)] for q, u in ingredient.amounts]}
+            for ingredient in result.ingredients
+        ]
+        ttl = _RESULT_CACHE.negative_ttl if negative else _RESULT_CACHE.ttl
+        _RESULT_DISK_CACHE.set(key, {"expires": time.time() + ttl, "negative": negative, "result": stored})
+
+
+def _recipe_events(url, api_key, max_workers):
+    """Yield iter_recipe_calories() events, replayed from the result cache (unscraped) when the HTML is unchanged.
+
+    Returns the RecipeResult, which may be shared, so copy it before changing it.
+    """
+    html, digest = fetch_recipe_page(url)  # fetched once, shared with the cook view
+    key = _result_cache_key(url, digest)
+    cached = _get_cached_result(key)
+    if cached is not None:
+        yield from _replay_events(cached)
+        return cached
+
+    extracted = extract_recipe(url, html)
+    for event in iter_recipe_calories(url, api_key, max_workers, extracted):
+        if event["type"] == "recipe":
+            result = RecipeResult(event["title"], event["servings"], None, None, [None] * event["ingredient_count"])
+        elif event["type"] == "ingredient":
+            result.ingredients[event["index"]] = event["ingredient"]
+        else:
+            result.total_kcal = event["total_kcal"]
+            result.per_serving = event["per_serving"]
+        yield event
+    if _cacheable_result(result):
+        _set_cached_result(key, result)
+    return result
+
+
+def _calculate_recipe(url, api_key, progress_callback, max_workers):
+    """calculate_recipe() without coalescing; the result may be shared, so copy it before changing it."""
+    events = _recipe_events(url, api_key, max_workers)
+    done = 0
+    while True:
+        try:
+            event = next(events)
+        except StopIteration as finished:
+            return finished.value
+        if event["type"] == "recipe":
+            total = event["ingredient_count"]
+        elif event["type"] == "ingredient" and progress_callback:
+            done += 1
+            progress_callback(done, total, event["ingredient"].raw[:60])
+
+
+def calculate_recipes(urls, api_key, max_workers=None):
+    """Calculate several recipes at once, e.g. a week of meal planning.
+
+    Pages are fetched concurrently (up to BATCH_FETCH_WORKERS), then every
+    recipe's ingredients are parsed and looked up as one pool, grouped by
+    cleaned name across the whole batch — "salt" in 20 recipes is one
+    lookup. Returns one entry per URL, in order: the calculate_recipe()
+    result, or the exception that stopped that recipe.
+    """
+    distinct = list(dict.fromkeys(urls))
+    scraped = {}
+    workers = max(1, min(BATCH_FETCH_WORKERS, len(distinct)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {submit(pool, scrape_recipe, url): url for url in distinct}
+        for future in as_completed(futures):
+            try:
+                scraped[futures[future]] = future.result()
+            except Exception as e:
+                scraped[futures[future]] = e
+
+    # All recipes' lines in one list; spans[url] is that recipe's slice
+    lines, spans = [], {}
+    for url in distinct:
+        recipe = scraped[url]
+        if not isinstance(recipe, Exception):
+            spans[url] = (len(lines), len(lines) + len(recipe["ingredients"]))
+            lines.extend(recipe["ingredients"])
+    with span("parse"):
+        parsed_all = parse_ingredient_list(lines)
+    owner = [None] * len(lines)
+    for url, (start, end) in spans.items():
+        owner[start:end] = [url] * (end - start)
+
+    groups = _group_by_name(parsed_all)
+    results = [None] * len(lines)
+    failed = {}  # url -> first lookup error in that recipe
+    workers = max(1, min(max_workers or USDA_MAX_WORKERS, len(groups) or 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {submit(pool, _calculate_group, parsed_all, indexes, api_key): indexes for indexes in groups}
+        for future in as_completed(futures):
+            try:
+                for i, result in future.result():
+                    results[i] = result
+            except Exception as e:
+                for i in futures[future]:
+                    failed.setdefault(owner[i], e)
+
+    outcomes = {}
+    for url in distinct:
+        if url in failed or isinstance(scraped[url], Exception):
+            outcomes[url] = failed.get(url) or scraped[url]
+            continue
+        recipe = scraped[url]
+        start, end = spans[url]
+        total_kcal, per_serving = _recipe_totals(recipe["servings"], results[start:end])
+        outcomes[url] = RecipeResult(recipe["title"], recipe["servings"], total_kcal, per_serving, results[start:end])
+    return [outcomes[url] for url in urls]
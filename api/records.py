@@ -0,0 +1,117 @@
+"""
+Calorie calculation results and their JSON wire format.
+
+IngredientResult and RecipeResult are __slots__ records rather than dicts:
+batch and bulk runs build thousands of ingredient results. Each record
+lists the fields it sends (WIRE_FIELDS); anything else, like the parser's
+amounts tuples, stays on the server without being stripped from every
+result before sending.
+
+dumps() encodes JSON data that may hold records, with orjson when it's
+installed and a stdlib encoder built once otherwise. Both write compact
+JSON; the stdlib one keeps its default escaping of non-ASCII text, which
+is its fastest mode.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class IngredientResult:
+    """One ingredient line's calculation (see calculate_ingredient_calories).
+
+    status is "ok", "skipped" (no usable quantity) or "not found" (no USDA
+    match); note says why, or which approximation was used.
+    """
+
+    __slots__ = ("raw", "name", "amounts", "grams", "kcal_per_100g", "total_kcal", "usda_match", "status", "note")
+    # amounts holds (quantity, pint unit) tuples, for the server only
+    WIRE_FIELDS = ("raw", "name", "grams", "kcal_per_100g", "total_kcal", "usda_match", "status", "note")
+
+    def __init__(self, raw, name=None, amounts=(), grams=None, kcal_per_100g=None,
+                 total_kcal=None, usda_match=None, status="ok", note=""):
+        self.raw = raw
+        self.name = name
+        self.amounts = amounts
+        self.grams = grams
+        self.kcal_per_100g = kcal_per_100g
+        self.total_kcal = total_kcal
+        self.usda_match = usda_match
+        self.status = status
+        self.note = note
+
+    @classmethod
+    def from_wire(cls, data):
+        """Rebuild a result from its wire form (no amounts)."""
+        return cls(**{field: data[field] for field in cls.WIRE_FIELDS if field in data})
+
+    def to_wire(self):
+        return {
+            "raw": self.raw,
+            "name": self.name,
+            "grams": self.grams,
+            "kcal_per_100g": self.kcal_per_100g,
+            "total_kcal": self.total_kcal,
+            "usda_match": self.usda_match,
+            "status": self.status,
+            "note": self.note,
+        }
+
+    def copy(self):
+        return IngredientResult(self.raw, self.name, self.amounts, self.grams, self.kcal_per_100g,
+                                self.total_kcal, self.usda_match, self.status, self.note)
+
+    def __repr__(self):
+        return f"IngredientResult({self.raw!r}, status={self.status!r}, total_kcal={self.total_kcal!r})"
+
+
+class RecipeResult:
+    """A whole recipe's calculation (see calculate_recipe): IngredientResults in recipe order plus totals."""
+
+    __slots__ = ("title", "servings", "total_kcal", "per_serving", "ingredients")
+    WIRE_FIELDS = __slots__
+
+    def __init__(self, title, servings, total_kcal, per_serving, ingredients):
+        self.title = title
+        self.servings = servings
+        self.total_kcal = total_kcal
+        self.per_serving = per_serving
+        self.ingredients = ingredients
+
+    def to_wire(self):
+        """The response dict; ingredients stay records, which dumps() encodes."""
+        return {
+            "title": self.title,
+            "servings": self.servings,
+            "total_kcal": self.total_kcal,
+            "per_serving": self.per_serving,
+            "ingredients": self.ingredients,
+        }
+
+    def copy(self):
+        return RecipeResult(self.title, self.servings, self.total_kcal, self.per_serving,
+                            [ingredient.copy() for ingredient in self.ingredients])
+
+    def __repr__(self):
+        return f"RecipeResult({self.title!r}, {len(self.ingredients)} ingredients, total_kcal={self.total_kcal!r})"
+
+
+def _to_wire(obj):
+    if isinstance(obj, (IngredientResult, RecipeResult)):
+        return obj.to_wire()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# Results never refer back to themselves, so skip the circular-reference bookkeeping
+_ENCODER = json.JSONEncoder(default=_to_wire, check_circular=False, separators=(",", ":"))
+
+
+def dumps(data):
+    """Encode data, records included, as JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_to_wire)
+    return _ENCODER.encode(data).encode("ascii")
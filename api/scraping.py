@@ -0,0 +1,609 @@
+"""
+Recipe page scraping, ingredient-line normalization and recipe validation.
+
+Shared by the calorie and cook mode endpoints. Kept apart from
+recipe_logic.py so the cook function doesn't pay for pint, the ingredient
+parser model or the USDA lookup code at cold start — only what's imported
+here.
+"""
+
+import hashlib
+import os
+import re
+import traceback
+
+import requests
+from bs4 import BeautifulSoup
+from lxml import etree
+from recipe_scrapers import scrape_html
+
+from api.cache import TTLCache
+from api.fetch import fetch_page
+from api.timing import span
+
+# Short-lived per-URL store of extract_recipe() results
+EXTRACT_CACHE_TTL = float(os.environ.get("EXTRACT_CACHE_TTL", 300))
+EXTRACT_CACHE_SIZE = int(os.environ.get("EXTRACT_CACHE_SIZE", 128))
+_EXTRACT_CACHE = TTLCache(EXTRACT_CACHE_SIZE, EXTRACT_CACHE_TTL)
+
+
+# Engine behind _fallback_scrape_html(): "lxml" (one pass over an lxml tree)
+# or "bs4" (the original BeautifulSoup walk, kept as the reference).
+FALLBACK_HTML_ENGINE = os.environ.get("FALLBACK_HTML_ENGINE", "lxml")
+
+# ids / classes of comment sections, dropped before anything is extracted
+_COMMENT_SECTION_RE = re.compile(r"comment|respond|reply|discussion", re.I)
+# Classes of the main post body, preferred for <p> instruction scanning
+_CONTENT_AREA_RE = re.compile(r"entry-content|post-content|recipe-body", re.I)
+# Strip trailing " — Site", " | Site", " - Site" suffixes from <title>
+_TITLE_SUFFIX_RE = re.compile(r"\s*(?:\u2014|\||[-\u2013])\s*(?!.*(?:\u2014|\||[-\u2013]))")
+_SERVINGS_HINT_RE = re.compile(r"serv|portion|yield", re.IGNORECASE)
+_SERVINGS_RE = re.compile(r"(\d+)\s*(?:servings?|portions?)", re.IGNORECASE)
+
+# Lines that look like ingredients
+_INGREDIENT_LINE_RE = re.compile(
+    r"^[\d\u00BC-\u00BE\u2150-\u215E]"  # starts with digit or unicode fraction
+    r"|^(a |one |two |three |four |half )",  # or common quantity words
+    re.IGNORECASE,
+)
+# Step prefix like "Make lids:", "Prepare sauce:", "For the crust:" — strong signal
+_STEP_PREFIX_RE = re.compile(
+    r"^(?:make|prepare|assemble|for\s+the)\s+[\w\s]+:", re.IGNORECASE,
+)
+# Imperative cooking verb near the start of the sentence
+_STEP_START_RE = re.compile(
+    r"^(?:\w+\s+){0,4}"  # up to 4 leading words
+    r"(heat|preheat|cook|bake|stir|add|combine|mix|whisk|fold|place|"
+    r"pour|bring|simmer|boil|reduce|remove|let|set|serve|season|toss|"
+    r"transfer|cover|drain|slice|chop|cut|spread|layer|roll|brush|"
+    r"divide|arrange|wipe|melt|assemble|prepare|rinse|pat|rub|"
+    r"line|grease|soak|knead|shape|form|trim|score|tent|rest|"
+    r"once|when|after|meanwhile)\b",
+    re.IGNORECASE,
+)
+
+# Elements whose text BeautifulSoup's get_text() leaves out (it types their
+# strings as Script, Stylesheet, TemplateString or ruby text)
+_HIDDEN_TEXT_TAGS = frozenset(("script", "style", "template", "rt", "rp"))
+_LXML_PARSER = etree.HTMLParser(encoding="utf-8")
+
+
+def _fallback_scrape_html(html):
+    """Extract recipe data from plain HTML when no Recipe schema is found.
+
+    Looks for ingredient-like <li> elements (lines starting with a number,
+    fraction, or common quantity word) and extracts the title from <h1>.
+    """
+    if FALLBACK_HTML_ENGINE == "bs4":
+        candidates = _fallback_candidates_bs4(html)
+    else:
+        candidates = _fallback_candidates_lxml(html)
+    return _pick_fallback(candidates)
+
+
+def _pick_fallback(c):
+    """Choose title, servings, ingredients and instructions from the candidates.
+
+    c is the dict built by _fallback_candidates_bs4/_lxml:
+      title, h1, h2      text of the first such element, or None if absent
+      li                 text of every <li>
+      br_paragraphs      stripped lines of each <p> with at least two <br>
+      servings_strings   strings mentioning serv/portion/yield, in page order
+      ol                 <li> texts of each <ol>
+      step_paragraphs    text of each <p> in the content area (whole page
+                         if there isn't one)
+    """
+    # Prefer <title> (strip common " — Site Name" / " | Site Name" suffixes),
+    # then fall back to the first <h1> or <h2>.
+    title = None
+    if c["title"] is not None:
+        title = _TITLE_SUFFIX_RE.split(c["title"], maxsplit=1)[0].strip()
+    if not title:
+        title = c["h1"] if c["h1"] is not None else c["h2"]
+    if not title:
+        title = "Unknown Recipe"
+
+    # Keep the <li> texts that look like ingredients
+    ingredients = [text for text in c["li"] if text and _INGREDIENT_LINE_RE.search(text)]
+
+    # Also try <p> tags with <br>-separated lines (some sites like Smitten
+    # Kitchen put ingredients in a single <p> with <br> instead of <li>).
+    # If this finds more ingredient-like lines, prefer it over the <li> scan.
+    best_p_lines = []
+    for lines in c["br_paragraphs"]:
+        matches = [l for l in lines if _INGREDIENT_LINE_RE.search(l)]
+        if len(matches) > len(best_p_lines):
+            best_p_lines = matches
+    if len(best_p_lines) > len(ingredients):
+        ingredients = best_p_lines
+
+    # Look for a servings mention near the recipe
+    servings_text = None
+    for text in c["servings_strings"]:
+        match = _SERVINGS_RE.search(text)
+        if match:
+            servings_text = match.group(0)
+            break
+
+    # Extract instructions: look for <ol> with multiple <li>, or long <p> blocks
+    # that read like preparation steps (sentences, not ingredient lines).
+    instructions = []
+    # Strategy 1: ordered list items (most structured recipe sites)
+    for items in c["ol"]:
+        if len(items) > len(instructions):
+            instructions = items
+    # Strategy 2: <p> tags that look like imperative cooking steps.
+    # To avoid blog headnotes/prose, require the sentence (or a sub-heading
+    # prefix like "Make filling:") to START with a cooking verb.
+    if not instructions:
+        for text in c["step_paragraphs"]:
+            if len(text) > 30 and not _INGREDIENT_LINE_RE.search(text):
+                if _STEP_PREFIX_RE.search(text) or _STEP_START_RE.search(text):
+                    instructions.append(text)
+
+    return title, servings_text, ingredients, instructions
+
+
+def _fallback_candidates_bs4(html):
+    """Collect _pick_fallback() candidates with BeautifulSoup (reference engine)."""
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Remove comment sections so they don't pollute instruction extraction.
+    for el in soup.find_all(id=_COMMENT_SECTION_RE):
+        el.decompose()
+    for el in soup.find_all(class_=_COMMENT_SECTION_RE):
+        el.decompose()
+
+    def first_text(name):
+        tag = soup.find(name)
+        return tag.get_text(strip=True) if tag is not None else None
+
+    br_paragraphs = []
+    for p_tag in soup.find_all("p"):
+        if len(p_tag.find_all("br")) >= 2:
+            br_paragraphs.append([s.strip() for s in p_tag.stripped_strings if s.strip()])
+
+    # Prefer content area (entry-content, post-content) to avoid sidebar prose
+    content_area = soup.find(class_=_CONTENT_AREA_RE) or soup
+
+    return {
+        "title": first_text("title"),
+        "h1": first_text("h1"),
+        "h2": first_text("h2"),
+        "li": [li.get_text(" ", strip=True) for li in soup.find_all("li")],
+        "br_paragraphs": br_paragraphs,
+        "servings_strings": [str(s) for s in soup.find_all(string=_SERVINGS_HINT_RE)],
+        "ol": [[li.get_text(" ", strip=True) for li in ol.find_all("li")] for ol in soup.find_all("ol")],
+        "step_paragraphs": [p_tag.get_text(" ", strip=True) for p_tag in content_area.find_all("p")],
+    }
+
+
+def _fallback_candidates_lxml(html):
+    """Collect _pick_fallback() candidates in a single walk over an lxml tree.
+
+    Mirrors _fallback_candidates_bs4(): the visible text is gathered once as
+    a flat list of stripped strings, and each element of interest just
+    records the slice of that list it spans. Pages that lean on implied end
+    tags (an unclosed <li> or <p>) are split the way browsers split them,
+    where html.parser would nest them instead.
+    """
+    candidates = {
+        "title": None, "h1": None, "h2": None, "li": [], "br_paragraphs": [],
+        "servings_strings": [], "ol": [], "step_paragraphs": [],
+    }
+    root = etree.fromstring(html.encode("utf-8", "replace"), _LXML_PARSER)
+    if root is None:  # empty document
+        return candidates
+
+    texts = []        # stripped, non-empty visible strings in page order
+    servings = candidates["servings_strings"]
+    firsts = {}       # "title" / "h1" / "h2" -> [start, end] in texts
+    li_spans = []     # [start, end] per <li>, in page order
+    ol_items = []     # <li> indexes per <ol>
+    paragraphs = []   # [start, end, br_count, in_content_area] per <p>
+    stack = []        # per open element: (tag, slot, is_content_area); tag None if skipped
+    open_ps, open_ols = [], []
+    hidden = 0        # open elements whose text get_text() leaves out
+    content_area = None  # None until the first content-area element, then "open" / "closed"
+
+    def add_text(s):
+        if _SERVINGS_HINT_RE.search(s):
+            servings.append(s)
+        if not hidden:
+            s = s.strip()
+            if s:
+                texts.append(s)
+
+    walker = etree.iterwalk(root.getroottree(), events=("start", "end", "comment", "pi"))
+    for event, el in walker:
+        if event == "start":
+            tag = el.tag
+            if _COMMENT_SECTION_RE.search(el.get("id", "")) or _COMMENT_SECTION_RE.search(el.get("class", "")):
+                walker.skip_subtree()
+                stack.append((None, None, False))
+                continue
+            slot = None
+            if tag in ("title", "h1", "h2"):
+                if tag not in firsts:
+                    slot = firsts[tag] = [len(texts), None]
+            elif tag == "li":
+                slot = len(li_spans)
+                li_spans.append([len(texts), None])
+                for items in open_ols:
+                    items.append(slot)
+            elif tag == "p":
+                slot = [len(texts), None, 0, content_area == "open"]
+                paragraphs.append(slot)
+                open_ps.append(slot)
+            elif tag == "br":
+                for p in open_ps:
+                    p[2] += 1
+            elif tag == "ol":
+                slot = []
+                ol_items.append(slot)
+                open_ols.append(slot)
+            is_area = content_area is None and bool(_CONTENT_AREA_RE.search(el.get("class", "")))
+            if is_area:
+                content_area = "open"
+            stack.append((tag, slot, is_area))
+            if tag in _HIDDEN_TEXT_TAGS:
+                hidden += 1
+            if el.text:
+                add_text(el.text)
+        elif event == "end":
+            tag, slot, is_area = stack.pop()
+            if tag is not None:
+                if is_area:
+                    content_area = "closed"
+                if tag in _HIDDEN_TEXT_TAGS:
+                    hidden -= 1
+                if tag == "li":
+                    li_spans[slot][1] = len(texts)
+                elif tag == "p":
+                    slot[1] = len(texts)
+                    open_ps.pop()
+                elif tag == "ol":
+                    open_ols.pop()
+                elif slot is not None and tag in ("title", "h1", "h2"):
+                    slot[1] = len(texts)
+            if el.tail:
+                add_text(el.tail)
+        else:  # comment or processing instruction: only its tail is page text
+            if el.text and _SERVINGS_HINT_RE.search(el.text):
+                servings.append(el.text)
+            if el.tail:
+                add_text(el.tail)
+
+    for name, (start, end) in firsts.items():
+        candidates[name] = "".join(texts[start:end])
+    li_texts = [" ".join(texts[start:end]) for start, end in li_spans]
+    candidates["li"] = li_texts
+    candidates["ol"] = [[li_texts[i] for i in items] for items in ol_items]
+    for start, end, br_count, in_area in paragraphs:
+        if br_count >= 2:
+            candidates["br_paragraphs"].append(texts[start:end])
+        if in_area or content_area is None:
+            candidates["step_paragraphs"].append(" ".join(texts[start:end]))
+    return candidates
+
+
+# Matches common measurement units and food words — used to distinguish real
+# ingredients from garbage scraped off non-recipe pages.
+_RECIPE_SIGNAL_RE = re.compile(
+    r"\b(cups?|tbsp|tablespoons?|tsp|teaspoons?|oz|ounces?|pounds?|lbs?|"
+    r"grams?|kg|ml|liters?|pinch|dash|cloves?|slices?|cans?|bunch|sprigs?|"
+    r"heads?|stalks?|"
+    r"flour|sugar|salt|butter|oil|eggs?|milk|cream|water|chicken|beef|pork|"
+    r"onions?|garlic|pepper|cheese|rice|pasta|sauce|broth|stock|vinegar|"
+    r"baking|vanilla|cinnamon|cumin|paprika|oregano|basil|thyme|"
+    r"lemon|tomato|potato|carrot|celery|mushroom|honey|soy|ginger)\b",
+    re.IGNORECASE,
+)
+
+
+def validate_recipe_data(ingredients, instructions, scraper_tier):
+    """Check that scraped data looks like a real recipe.
+
+    Tier 1/2 (JSON-LD schema) are trusted. Tier 3 (regex fallback) gets
+    heuristic checks for food/measurement words.
+
+    Raises ValueError with a user-friendly message if validation fails.
+    """
+    if not ingredients and not instructions:
+        raise ValueError(
+            "No recipe found on this page. Try pasting a URL from a recipe website."
+        )
+
+    if scraper_tier in (1, 2):
+        return  # page declared Recipe schema — trust it
+
+    # Tier 3: require at least 2 ingredients with food/measurement signal
+    if len(ingredients) < 2:
+        raise ValueError(
+            "This page doesn't appear to contain a recipe. "
+            "Try pasting a URL from a recipe website."
+        )
+
+    if not any(_RECIPE_SIGNAL_RE.search(ing) for ing in ingredients):
+        raise ValueError(
+            "This page doesn't appear to contain a recipe. "
+            "Try pasting a URL from a recipe website."
+        )
+
+
+# Scraper fields extracted for the calorie and cook views combined
+_SCHEMA_FIELDS = ("title", "yields", "ingredients", "instructions", "prep_time", "cook_time", "total_time")
+# Fields the calorie view needs from the scraper all at once
+_CALORIE_FIELDS = frozenset(("title", "yields", "ingredients"))
+
+
+def extract_recipe(url, html=None):
+    """Fetch and scrape a recipe page once, for both the calorie and cook views.
+
+    Returns a dict with:
+      tier      1 (supported site), 2 (generic schema) or 3 (no schema found)
+      schema    scraper field values (None where the scraper raised), or None
+      failed    names of scraper fields that raised
+      fallback  _fallback_scrape_html() output, or None if neither view needs it
+      page_hash sha256 of the HTML it was scraped from (see page_hash)
+
+    Results are kept per URL for EXTRACT_CACHE_TTL seconds, so opening a
+    recipe in both views downloads and scrapes it once. Callers must not
+    mutate the returned data. Pass html if the page has already been
+    fetched; a kept result from different HTML is then scraped again.
+    """
+    digest = None if html is None else page_hash(html)
+    cached = _EXTRACT_CACHE.get(url)
+    if cached is not None and digest in (None, cached["page_hash"]):
+        return cached
+
+    if html is None:
+        html = fetch_page(url)
+        digest = page_hash(html)
+
+    scraper_tier = 3
+    schema = None
+    failed = set()
+    with span("scrape"):
+        try:
+            scraper = scrape_html(html, org_url=url)
+            scraper_tier = 1
+        except Exception:
+            try:
+                # Site not directly supported - try generic mode (reads JSON-LD / microdata)
+                scraper = scrape_html(html, org_url=url, supported_only=False)
+                scraper_tier = 2
+            except Exception:
+                scraper = None
+
+        if scraper is not None:
+            schema = {}
+            for field in _SCHEMA_FIELDS:
+                try:
+                    schema[field] = getattr(scraper, field)()
+                except Exception:
+                    schema[field] = None
+                    failed.add(field)
+            raw = schema["instructions"]
+            if isinstance(raw, str):
+                schema["instructions"] = [s.strip() for s in raw.split("\n") if s.strip()]
+            elif not isinstance(raw, list):
+                schema["instructions"] = []
+
+    fallback = None
+    if (
+        schema is None
+        or failed & _CALORIE_FIELDS
+        or not schema["ingredients"]
+        or not schema["instructions"]
+    ):
+        with span("fallback"):
+            fallback = _fallback_scrape_html(html)
+
+    result = {
+        "tier": scraper_tier,
+        "schema": schema,
+        "failed": frozenset(failed),
+        "fallback": fallback,
+        "page_hash": digest,
+    }
+    _EXTRACT_CACHE.set(url, result)
+    return result
+
+
+def page_hash(html):
+    """Identify a page's content, e.g. to key results built from it."""
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def fetch_recipe_page(url):
+    """Return (html, page_hash) for a recipe URL without scraping it.
+
+    html is None when a kept extract_recipe() result already covers the
+    page; either way, extract_recipe(url, html) then fetches nothing more.
+    """
+    cached = _EXTRACT_CACHE.get(url)
+    if cached is not None:
+        return None, cached["page_hash"]
+    html = fetch_page(url)
+    return html, page_hash(html)
+
+
+def scrape_recipe(url, extracted=None):
+    """Fetch and parse a recipe from a URL.
+
+    Returns dict with title, servings (int), and ingredients (list of str).
+    Pass extracted (an extract_recipe() result) if the page is already in hand.
+    """
+    data = extracted if extracted is not None else extract_recipe(url)
+    scraper_tier = data["tier"]
+    schema = data["schema"]
+
+    title = ingredients = yields_str = None
+    if schema is not None and not data["failed"] & _CALORIE_FIELDS:
+        title = schema["title"]
+        yields_str = schema["yields"]
+        ingredients = schema["ingredients"]
+
+    if not ingredients:
+        # No schema found — fall back to plain HTML extraction
+        scraper_tier = 3
+        title, yields_str, ingredients, _instructions = data["fallback"]
+
+    validate_recipe_data(ingredients or [], [], scraper_tier)
+
+    servings = _parse_servings(yields_str)
+
+    return {
+        "title": title,
+        "servings": servings,
+        "ingredients": ingredients,
+    }
+
+
+def scrape_cook_data(url):
+    """Scrape a recipe URL for cook mode data (no calorie lookup)."""
+    data = extract_recipe(url)
+    scraper_tier = data["tier"]
+    schema = data["schema"] or {}
+
+    result = {
+        "title": schema.get("title"),
+        "ingredients": schema.get("ingredients") or [],
+        "instructions": schema.get("instructions") or [],
+        "prep_time": schema.get("prep_time"),
+        "cook_time": schema.get("cook_time"),
+        "total_time": schema.get("total_time"),
+    }
+
+    # Fall back to plain HTML extraction if scraper missed ingredients OR instructions
+    if not result["ingredients"] or not result["instructions"]:
+        scraper_tier = 3
+        title, _servings, ingredients, instructions = data["fallback"]
+        result["title"] = result["title"] or title
+        if not result["ingredients"]:
+            result["ingredients"] = ingredients
+        if not result["instructions"]:
+            result["instructions"] = instructions
+
+    validate_recipe_data(result["ingredients"], result["instructions"], scraper_tier)
+
+    result["ingredients"] = normalize_ingredient_lines(result["ingredients"])
+
+    return result
+
+
+def error_response(exc, generic_message):
+    """Map an exception from scraping or calculation to (status, JSON payload).
+
+    Shared by every endpoint so errors are classified the same way: blocked
+    sites, user-facing ValueErrors, and anything else as a 500 with the
+    traceback in debug.
+    """
+    if isinstance(exc, requests.exceptions.HTTPError):
+        status = exc.response.status_code if exc.response is not None else 'unknown'
+        return 400, {
+            "error": "This website blocked our request. Please try a different URL.",
+            "debug": f"HTTP {status}",
+        }
+    if isinstance(exc, ValueError):
+        return 400, {"error": str(exc)}
+    return 500, {"error": generic_message, "debug": "".join(traceback.format_exception(exc))}
+
+
+def _parse_servings(yields_str):
+    """Extract an integer serving count from strings like '24 servings'."""
+    if not yields_str:
+        return None
+    match = re.search(r"(\d+)", str(yields_str))
+    return int(match.group(1)) if match else None
+
+
+# Bump when _simplify_alternatives() or _normalize_raw_ingredient() change
+# what they produce: cached parses and results are keyed by it
+NORMALIZATION_VERSION = 1
+
+
+def _simplify_alternatives(raw):
+    """Simplify 'A or B' ingredient alternatives to just the first option.
+
+    '2 large or 3 medium carrots' -> '2 large carrots'
+    '1 cup milk or cream' -> '1 cup milk' (already handled by name cleaning)
+    """
+    # Match: "NUMBER [words] or NUMBER [words] INGREDIENT"
+    match = re.match(
+        r"^(\d[\d/.\s]*\S+)\s+or\s+\d[\d/.\s]*\S+\s+(.+)$", raw, re.IGNORECASE
+    )
+    if match:
+        return f"{match.group(1)} {match.group(2)}"
+    return raw
+
+
+UNIT_NORMALIZATIONS = [
+    (r"\blb's\b", "lbs"),
+    (r"\boz's\b", "oz"),
+    (r"\btblsp\b", "tbsp"),
+    (r"\btbls\b", "tbsp"),
+    (r"\btsps?\.\b", "tsp"),
+    (r"\btbsps?\.\b", "tbsp"),
+]
+
+
+_UNIT_NORMALIZATION_RES = [(re.compile(pattern, re.IGNORECASE), repl) for pattern, repl in UNIT_NORMALIZATIONS]
+# Every UNIT_NORMALIZATIONS pattern minus its trailing \b: if this finds
+# nothing, none of them can match and the ordered subs are all no-ops.
+_UNIT_NORMALIZATION_GATE = re.compile(r"\b(?:lb's|oz's|tblsp|tbls|tsps?\.|tbsps?\.)", re.IGNORECASE)
+_BROKEN_HYPHEN_RE = re.compile(r"(\w)- (\w)")
+_CONVERSION_NOTE_RE = re.compile(
+    r"\s*\([^)]*(?:grams?|oz|ounces?|cups?|ml|liters?|litres?|lbs?|pounds?|kg|inch|inches|cm)\b[^)]*\)",
+    re.IGNORECASE,
+)
+_MULTI_SPACE_RE = re.compile(r"  +")
+_MULTIPACK_RE = re.compile(
+    r"^(\d+)\s*x\s*(\d+)\s*(g|kg|oz|lb|lbs|ml|l)\b\s*(?:can|cans|tin|tins|bag|bags|box|boxes|packet|packets|package|packages|jar|jars|bottle|bottles|carton|cartons|pouch|pouches)?\s*(.*)$",
+    re.IGNORECASE,
+)
+_ABOUT_AMOUNT_RE = re.compile(r"^\d[\d\s/]*\S+\s+\(about\s+(.+)\)\s*$", re.IGNORECASE)
+
+
+def _normalize_raw_ingredient(raw):
+    """Fix common unit typos/variants before parsing."""
+    # Normalize smart quotes/curly apostrophes to plain apostrophe
+    result = raw.replace("\u2019", "'").replace("\u2018", "'")
+    # Fix broken hyphens from HTML line-breaks: "sodium- free" → "sodium-free"
+    if "- " in result:
+        result = _BROKEN_HYPHEN_RE.sub(r"\1-\2", result)
+    if _UNIT_NORMALIZATION_GATE.search(result):
+        for pattern, replacement in _UNIT_NORMALIZATION_RES:
+            result = pattern.sub(replacement, result)
+    # Strip parenthetical conversion notes: "(115 grams or 3/4 cup)" etc.
+    if "(" in result:
+        result = _CONVERSION_NOTE_RE.sub("", result)
+    if "  " in result:
+        result = _MULTI_SPACE_RE.sub(" ", result)
+    result = result.strip()
+    # "1 x 400g can ..." → "400g ..."  (multiply out the N × weight)
+    match = _MULTIPACK_RE.match(result)
+    if match:
+        multiplier = int(match.group(1))
+        weight = int(match.group(2)) * multiplier
+        unit = match.group(3)
+        rest = match.group(4)
+        result = f"{weight} {unit} {rest}".strip()
+    # "1 extra-large (about 2 1/2 cups onion, diced)" → "2 1/2 cups onion, diced"
+    match = _ABOUT_AMOUNT_RE.match(result)
+    if match:
+        result = match.group(1)
+    return result
+
+
+def normalize_ingredient_lines(lines, simplify=False):
+    """Normalize a recipe's whole ingredient list, keeping order.
+
+    With simplify=True, 'A or B' alternatives are also reduced to the first
+    option — the form the ingredient parser expects. Cook mode displays the
+    lines, so it leaves alternatives in.
+    """
+    if simplify:
+        return [_normalize_raw_ingredient(_simplify_alternatives(line)) for line in lines]
+    return [_normalize_raw_ingredient(line) for line in lines]
@@ -0,0 +1,100 @@
+"""
+Lightweight per-request timing spans.
+
+A handler opens collect() around its work; code anywhere below it wraps a
+stage in span("name"), and the handler reports the result as a
+Server-Timing header and, on request, in the payload's debug field.
+Outside collect() a span costs one ContextVar lookup, so library code can
+be instrumented unconditionally.
+
+The collector lives in a ContextVar. Thread pools don't inherit context,
+so work handed to one must go through submit() to be timed.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+
+_collector = contextvars.ContextVar("timing_collector", default=None)
+
+
+class Timings:
+    """Spans recorded during one request: (name, start_ms, duration_ms, detail)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []  # list.append is atomic, so pool threads can record too
+
+    def add(self, name, started, detail=None):
+        now = time.perf_counter()
+        self.spans.append((name, (started - self.started) * 1000, (now - started) * 1000, detail))
+
+    def stages(self):
+        """Total duration and count per span name, in first-seen order."""
+        totals = {}
+        for name, _start, duration, _detail in self.spans:
+            stage = totals.setdefault(name, {"ms": 0.0, "count": 0})
+            stage["ms"] += duration
+            stage["count"] += 1
+        return totals
+
+    def header(self):
+        """Server-Timing header value, one metric per span name plus the total."""
+        parts = []
+        for name, stage in self.stages().items():
+            desc = f';desc="{stage["count"]} calls"' if stage["count"] > 1 else ""
+            parts.append(f"{name};dur={stage['ms']:.1f}{desc}")
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+    def as_dict(self):
+        """Stage totals plus every individual span, for the debug payload."""
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "stages": {name: {"ms": round(s["ms"], 1), "count": s["count"]} for name, s in self.stages().items()},
+            "spans": [
+                {"name": name, "start_ms": round(start, 1), "ms": round(duration, 1), **({"detail": detail} if detail is not None else {})}
+                for name, start, duration, detail in self.spans
+            ],
+        }
+
+
+@contextmanager
+def collect():
+    """Record spans from this context (and submit()ted work) into a new Timings."""
+    timings = Timings()
+    token = _collector.set(timings)
+    try:
+        yield timings
+    finally:
+        _collector.reset(token)
+
+
+@contextmanager
+def span(name, detail=None):
+    """Time the enclosed block as `name` if a collector is active."""
+    timings = _collector.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, started, detail)
+
+
+def attach_debug(payload, timings):
+    """Add timings to a response payload's debug field; returns the payload."""
+    if "error" in payload:
+        # Error debug is free text, shown as-is in the frontend's debug panel
+        debug = payload.get("debug")
+        payload["debug"] = (f"{debug}\n\n" if debug else "") + f"Server-Timing: {timings.header()}"
+    else:
+        payload["debug"] = {"timing": timings.as_dict()}
+    return payload
+
+
+def submit(pool, fn, *args):
+    """pool.submit() that carries the current timing collector into the worker."""
+    return pool.submit(contextvars.copy_context().run, fn, *args)
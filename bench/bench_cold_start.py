@@ -0,0 +1,56 @@
+"""
+Cold-start benchmark: time to import each serverless function module.
+
+Every sample runs in a fresh interpreter, so nothing is cached in-process —
+close to what a new serverless instance pays before handling its first
+request. Also reports whether the calorie-only dependencies got loaded.
+
+Run from the repo root:  python -m bench.bench_cold_start [--runs 7]
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+
+ROOT = pathlib.Path(__file__).parent.parent
+ENDPOINTS = ("api.cook", "api.calculate")
+HEAVY_MODULES = ("pint", "ingredient_parser", "nltk")
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def sample(module):
+    env = dict(os.environ)
+    env.setdefault("NLTK_DATA", str(ROOT / "api" / "nltk_data"))
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import time per endpoint")
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    for module in ENDPOINTS:
+        samples = [sample(module) for _ in range(args.runs)]
+        times = [s["seconds"] * 1000 for s in samples]
+        loaded = ", ".join(samples[-1]["loaded"]) or "none"
+        print(f"{module:<15} median {statistics.median(times):7.1f} ms  "
+              f"min {min(times):7.1f} ms  max {max(times):7.1f} ms  heavy deps: {loaded}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: the plain-HTML fallback extractor, BeautifulSoup vs lxml engine.
+
+Runs _fallback_scrape_html() on every saved page with both engines, checks
+that title, servings, ingredients and instructions come out the same, and
+reports the median time per page. Exits non-zero on any mismatch.
+
+The pages in bench/fixtures/pages are hand-built stand-ins for common blog
+layouts (recipe cards, <br>-separated ingredients, prose steps, long comment
+threads) plus a page of markup edge cases. Point --pages at a directory of
+saved real-world pages to check those too.
+
+Run from the repo root:  python -m bench.bench_fallback_html [--pages DIR] [--runs 15]
+"""
+
+import argparse
+import pathlib
+import statistics
+import sys
+import time
+
+from api import scraping
+
+PAGES_DIR = pathlib.Path(__file__).parent / "fixtures" / "pages"
+ENGINES = ("bs4", "lxml")
+
+
+def run(engine, html, runs):
+    scraping.FALLBACK_HTML_ENGINE = engine
+    result = scraping._fallback_scrape_html(html)
+    times = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        scraping._fallback_scrape_html(html)
+        times.append(time.perf_counter() - t)
+    return result, statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fallback HTML extraction, per engine")
+    parser.add_argument("--pages", type=pathlib.Path, default=PAGES_DIR)
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args()
+
+    pages = sorted(args.pages.glob("*.html"))
+    if not pages:
+        sys.exit(f"no .html files in {args.pages}")
+
+    mismatches = 0
+    totals = dict.fromkeys(ENGINES, 0.0)
+    for path in pages:
+        html = path.read_text(encoding="utf-8", errors="replace")
+        results, ms = {}, {}
+        for engine in ENGINES:
+            results[engine], ms[engine] = run(engine, html, args.runs)
+            totals[engine] += ms[engine]
+        same = results["lxml"] == results["bs4"]
+        print(f"{path.name:<36} {len(html) // 1024:>5} KB  bs4 {ms['bs4']:7.2f} ms  "
+              f"lxml {ms['lxml']:7.2f} ms  x{ms['bs4'] / ms['lxml']:5.1f}  "
+              f"{'ok' if same else 'MISMATCH'}")
+        if not same:
+            mismatches += 1
+            for engine in ENGINES:
+                print(f"    {engine}: {results[engine]!r}")
+
+    print(f"{'total':<45}  bs4 {totals['bs4']:7.2f} ms  lxml {totals['lxml']:7.2f} ms"
+          f"  x{totals['bs4'] / totals['lxml']:.1f}")
+    if mismatches:
+        sys.exit(f"{mismatches} page(s) differ between engines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Benchmark + equivalence check: compiled ingredient-text normalization.
+
+Compares _clean_ingredient_name() and _normalize_raw_ingredient() with the
+original implementations (copied below) on every line of
+bench/fixtures/ingredient_lines.txt and the saved pages, on case variants
+of those, and on generated strings that pile up the rule vocabulary
+(overlapping words, unit typos, broken hyphens, parentheses) to shake out
+ordering differences. Exits non-zero if any output differs.
+
+The fixture lines are hand-written in the style of real recipe sites; pass
+--lines with a file of saved real lines to check those too.
+
+Run from the repo root:  python -m bench.bench_normalize [--lines FILE] [--generated 20000]
+"""
+
+import argparse
+import os
+import pathlib
+import random
+import re
+import sys
+import timeit
+
+from bench import offline  # noqa: I001 — must come before api (page cache off)
+
+os.environ.setdefault("NLTK_DATA", str(pathlib.Path(__file__).parent.parent / "api" / "nltk_data"))
+
+from api import recipe_logic, scraping  # noqa: E402
+from api.scraping import UNIT_NORMALIZATIONS  # noqa: E402
+
+LINES_FILE = pathlib.Path(__file__).parent / "fixtures" / "ingredient_lines.txt"
+
+VOCABULARY = [
+    *recipe_logic._NAME_REMOVE_WORDS, *recipe_logic._NAME_SPLITTERS,
+    "lb's", "oz's", "LB'S", "tblsp", "tbls", "tsp.", "tsps.", "tbsp.", "Tbsps.", "tsp.x",
+    "- ", "-", "'", "’", "‘", ",", ".", "  ", "(", ")", "(about", "x", "1", "400", "g", "ml",
+    "grams", "oz", "cups", "inch", "can", "tins", "flour", "butter", "milk", "extra", "room", "at",
+    "well", "low", "fat", "free", "salt", "sodium", "temperature", "shaken",
+]
+
+
+def reference_clean_ingredient_name(name):
+    cleaned = name.lower()
+    for splitter in [" or ", " for ", " plus more", ", plus "]:
+        cleaned = cleaned.split(splitter)[0]
+    remove_words = [
+        "cold", "warm", "hot", "room temperature", "at room temperature",
+        "freshly", "fresh", "well-shaken", "well shaken",
+        "finely", "fine", "coarsely", "roughly", "thinly",
+        "unsalted", "salted", "softened", "melted", "frozen", "thawed",
+        "unbleached", "bleached", "sifted", "packed",
+        "large", "medium", "small", "extra-large",
+        "grated", "shredded", "chopped", "diced", "minced", "sliced",
+        "low-sodium", "sodium-free", "no-salt-added",
+        "low-fat", "reduced-fat", "full-fat", "nonfat", "fat-free",
+        "organic", "boneless", "skinless",
+    ]
+    for word in remove_words:
+        cleaned = re.sub(r"\b" + re.escape(word) + r"\b", "", cleaned)
+    cleaned = re.sub(r"\s+", " ", cleaned).strip(" ,")
+    return cleaned
+
+
+def reference_normalize_raw_ingredient(raw):
+    result = raw.replace("’", "'").replace("‘", "'")
+    result = re.sub(r"(\w)- (\w)", r"\1-\2", result)
+    for pattern, replacement in UNIT_NORMALIZATIONS:
+        result = re.sub(pattern, replacement, result, flags=re.IGNORECASE)
+    result = re.sub(
+        r"\s*\([^)]*(?:grams?|oz|ounces?|cups?|ml|liters?|litres?|lbs?|pounds?|kg|inch|inches|cm)\b[^)]*\)",
+        "", result, flags=re.IGNORECASE,
+    )
+    result = re.sub(r"  +", " ", result).strip()
+    match = re.match(
+        r"^(\d+)\s*x\s*(\d+)\s*(g|kg|oz|lb|lbs|ml|l)\b\s*(?:can|cans|tin|tins|bag|bags|box|boxes|packet|packets|package|packages|jar|jars|bottle|bottles|carton|cartons|pouch|pouches)?\s*(.*)$",
+        result,
+        re.IGNORECASE,
+    )
+    if match:
+        multiplier = int(match.group(1))
+        weight = int(match.group(2)) * multiplier
+        unit = match.group(3)
+        rest = match.group(4)
+        result = f"{weight} {unit} {rest}".strip()
+    match = re.match(r"^\d[\d\s/]*\S+\s+\(about\s+(.+)\)\s*$", result, re.IGNORECASE)
+    if match:
+        result = match.group(1)
+    return result
+
+
+def load_lines(extra_files):
+    lines = LINES_FILE.read_text(encoding="utf-8").splitlines()
+    for path in extra_files:
+        lines += pathlib.Path(path).read_text(encoding="utf-8").splitlines()
+    # Ingredient lists of the saved pages, as the scrapers return them
+    corpus = offline.load_corpus()
+    offline.install(corpus, {})
+    for entry in corpus:
+        lines += scraping.scrape_recipe(entry["url"])["ingredients"]
+    return [line for line in lines if line.strip()]
+
+
+def generated(count, seed=0):
+    rng = random.Random(seed)
+    joiners = [" ", " ", " ", "", ", ", "-", "  "]
+    out = []
+    for _ in range(count):
+        parts = [rng.choice(VOCABULARY) for _ in range(rng.randint(1, 8))]
+        text = "".join(part + rng.choice(joiners) for part in parts)
+        out.append(text.upper() if rng.random() < 0.1 else text)
+    return out
+
+
+def check(label, new, old, inputs):
+    bad = [(text, new(text), old(text)) for text in inputs if new(text) != old(text)]
+    print(f"{label:<28} {len(inputs):>7} inputs  {'ok' if not bad else f'{len(bad)} MISMATCHES'}")
+    for text, got, want in bad[:10]:
+        print(f"    {text!r}\n      new {got!r}\n      old {want!r}")
+    return len(bad)
+
+
+def bench(label, new, old, inputs, runs=5):
+    n = len(inputs)
+    old_s = min(timeit.repeat(lambda: [old(t) for t in inputs], number=1, repeat=runs))
+    new_s = min(timeit.repeat(lambda: [new(t) for t in inputs], number=1, repeat=runs))
+    print(f"{label:<28} old {old_s / n * 1e6:7.2f} us  new {new_s / n * 1e6:7.2f} us  x{old_s / new_s:5.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiled vs original ingredient text normalization")
+    parser.add_argument("--lines", action="append", default=[], help="extra file of ingredient lines (repeatable)")
+    parser.add_argument("--generated", type=int, default=20000, help="generated rule-vocabulary strings")
+    args = parser.parse_args()
+
+    lines = load_lines(args.lines)
+    variants = lines + [line.lower() for line in lines] + [line.upper() for line in lines] + [line.title() for line in lines]
+    fuzz = generated(args.generated)
+    # _clean_ingredient_name sees parser output; feed it normalized lines as well as raw text
+    names = variants + [reference_normalize_raw_ingredient(line) for line in variants] + fuzz
+
+    mismatches = check("_normalize_raw_ingredient", scraping._normalize_raw_ingredient,
+                       reference_normalize_raw_ingredient, variants + fuzz)
+    mismatches += check("_clean_ingredient_name", recipe_logic._clean_ingredient_name,
+                        reference_clean_ingredient_name, names)
+
+    print(f"\n{len(lines)} real-style lines:")
+    bench("_normalize_raw_ingredient", scraping._normalize_raw_ingredient, reference_normalize_raw_ingredient, lines)
+    bench("_clean_ingredient_name", recipe_logic._clean_ingredient_name, reference_clean_ingredient_name, lines)
+    if mismatches:
+        sys.exit(f"{mismatches} input(s) normalize differently")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Micro-benchmark: building and sending calculation results.
+
+Compares the original path (a 9-key dict per ingredient, copied per caller,
+'amounts' popped, stdlib json.dumps) with IngredientResult / RecipeResult
+records encoded by api.records.dumps(), using orjson when it's installed
+and the stdlib fallback either way. Results are batches of recipes built
+from bench/fixtures/ingredient_lines.txt; all paths must decode to the
+same JSON. Also reports the memory each form takes.
+
+Run from the repo root:  python -m bench.bench_serialize [--recipes 200]
+"""
+
+import argparse
+import json
+import pathlib
+import sys
+import timeit
+import tracemalloc
+
+from api import records
+from api.records import IngredientResult, RecipeResult
+
+LINES_FILE = pathlib.Path(__file__).parent / "fixtures" / "ingredient_lines.txt"
+
+
+def ingredient_fields(lines):
+    """Plausible calculate_ingredient_calories() output for each line."""
+    out = []
+    for i, raw in enumerate(lines):
+        found = i % 7 != 0
+        out.append({
+            "raw": raw,
+            "name": raw.split(",")[0].lower(),
+            "amounts": ((float(i % 5 + 1), "cup"),),
+            "grams": round(40.0 + i * 3.3, 1),
+            "kcal_per_100g": round(50.0 + i % 400, 1) if found else None,
+            "total_kcal": round(20.0 + i * 1.7, 1) if found else None,
+            "usda_match": f"{raw.title()}, raw" if found else None,
+            "status": "ok" if found else "not found",
+            "note": "" if found else "no USDA results",
+        })
+    return out
+
+
+def as_dicts(recipes):
+    return [{**recipe, "ingredients": [dict(fields) for fields in recipe["ingredients"]]} for recipe in recipes]
+
+
+def as_records(recipes):
+    return [
+        RecipeResult(recipe["title"], recipe["servings"], recipe["total_kcal"], recipe["per_serving"],
+                     [IngredientResult(**fields) for fields in recipe["ingredients"]])
+        for recipe in recipes
+    ]
+
+
+def old_send(recipes):
+    copies = as_dicts(recipes)  # _copy_recipe()
+    for recipe in copies:
+        for ing in recipe["ingredients"]:
+            ing.pop("amounts", None)
+    return json.dumps({"results": [{"status": 200, "recipe": recipe} for recipe in copies]}).encode("utf-8")
+
+
+def new_send(recipes, encode):
+    copies = [recipe.copy() for recipe in recipes]  # _copy_recipe()
+    return encode({"results": [{"status": 200, "recipe": recipe} for recipe in copies]})
+
+
+def stdlib_dumps(data):
+    return records._ENCODER.encode(data).encode("ascii")
+
+
+def allocated(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Result records + dumps() vs dicts + json.dumps")
+    parser.add_argument("--recipes", type=int, default=200, help="recipes per batch")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    lines = [line for line in LINES_FILE.read_text(encoding="utf-8").splitlines() if line.strip()]
+    fields = ingredient_fields(lines)
+    per_recipe = 12
+    recipes = []
+    for r in range(args.recipes):
+        start = r * per_recipe % max(1, len(fields) - per_recipe)
+        ingredients = fields[start:start + per_recipe]
+        total = round(sum(f["total_kcal"] or 0 for f in ingredients), 1)
+        recipes.append({"title": f"Recipe {r}", "servings": 4, "total_kcal": total,
+                        "per_serving": round(total / 4, 1), "ingredients": ingredients})
+    dict_recipes = as_dicts(recipes)
+    record_recipes = as_records(recipes)
+    count = args.recipes * per_recipe
+
+    paths = {"dicts + json.dumps": lambda: old_send(dict_recipes),
+             "records + stdlib encoder": lambda: new_send(record_recipes, stdlib_dumps)}
+    if records.orjson is not None:
+        paths["records + orjson"] = lambda: new_send(record_recipes, records.dumps)
+    else:
+        print("orjson not installed; records.dumps() uses the stdlib encoder")
+
+    expected = json.loads(paths["dicts + json.dumps"]())
+    mismatched = [label for label, send in paths.items() if json.loads(send()) != expected]
+
+    print(f"{args.recipes} recipes, {count} ingredients")
+    baseline = None
+    for label, send in paths.items():
+        seconds = min(timeit.repeat(send, number=1, repeat=args.runs))
+        baseline = baseline or seconds
+        print(f"  {label:<26} {seconds * 1000:8.2f} ms  {seconds / count * 1e6:6.2f} us/ingredient  x{baseline / seconds:4.1f}")
+    print(f"  memory: dicts {allocated(lambda: as_dicts(recipes)) / count:.0f} B/ingredient, "
+          f"records {allocated(lambda: as_records(recipes)) / count:.0f} B/ingredient")
+    if mismatched:
+        sys.exit(f"output differs for: {', '.join(mismatched)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Stage-level benchmark suite, fully offline.
+
+Times each stage of the pipeline on the saved corpus in bench/fixtures
+(tier 1, 2 and 3 pages listed in corpus.json, USDA search responses in
+usda_search.json, both served through bench.offline): the plain-HTML
+fallback, recipe-scrapers per tier, ingredient-line normalization and
+parsing, unit conversion, the table lookups and calculate_recipe end to
+end with cold caches. The pages and USDA responses are hand-built in the
+shape of the real ones; add saved pages to corpus.json as they're collected.
+
+Results can be written as JSON and compared against an earlier run; the
+comparison exits non-zero when any stage got slower than --threshold.
+
+Run from the repo root:
+  python -m bench.bench_stages --json before.json
+  python -m bench.bench_stages --compare before.json [--threshold 20]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from importlib import metadata
+
+from bench import offline  # noqa: I001 — must come before api (page cache off)
+
+ROOT = pathlib.Path(__file__).parent.parent
+os.environ.setdefault("NLTK_DATA", str(ROOT / "api" / "nltk_data"))
+
+from recipe_scrapers import scrape_html  # noqa: E402
+
+from api import recipe_logic, scraping  # noqa: E402
+
+PACKAGES = ("recipe-scrapers", "ingredient-parser-nlp", "beautifulsoup4", "lxml", "pint")
+API_KEY = "BENCH"
+
+
+def scrape_tier(entry):
+    """The scraper half of extract_recipe(): tier 1, then generic, then none."""
+    try:
+        scraper = scrape_html(entry["html"], org_url=entry["url"])
+    except Exception:
+        try:
+            scraper = scrape_html(entry["html"], org_url=entry["url"], supported_only=False)
+        except Exception:
+            return
+    for field in scraping._SCHEMA_FIELDS:
+        try:
+            getattr(scraper, field)()
+        except Exception:
+            pass
+
+
+def clear_caches():
+    scraping._EXTRACT_CACHE.clear()
+    recipe_logic._PARSE_CACHE.clear()
+    recipe_logic._USDA_CACHE.clear()
+    recipe_logic._RECENT_RECIPES.clear()
+    recipe_logic._RESULT_CACHE.clear()
+
+
+def build_stages(corpus):
+    """Return {name: (ops, run, setup)}; run() does `ops` operations."""
+    lines = [line for entry in corpus for line in scraping.scrape_recipe(entry["url"])["ingredients"]]
+    distinct = list(dict.fromkeys(lines))
+    parsed = recipe_logic.parse_ingredient_list(lines)
+    names = [recipe_logic._clean_ingredient_name(p["name"]) for p in parsed]
+    amounts = [(q, unit, p["name"], p.get("size")) for p in parsed for q, unit in p["amounts"]]
+    by_tier = {tier: [e for e in corpus if e["tier"] == tier] for tier in (1, 2, 3)}
+
+    def each(items, fn):
+        return lambda: [fn(item) for item in items]
+
+    def lookups(name):
+        recipe_logic._DENSITY_MATCHER.longest(name)
+        recipe_logic._KNOWN_KCAL_MATCHER.longest(name)
+        recipe_logic._ITEM_WEIGHT_MATCHER.longest(name)
+
+    def calculate(entry):
+        clear_caches()
+        recipe_logic.calculate_recipe(entry["url"], API_KEY)
+
+    def extract(entry):
+        scraping._EXTRACT_CACHE.clear()
+        scraping.extract_recipe(entry["url"])
+
+    stages = {
+        "fallback_scrape_html": (len(corpus), each(corpus, lambda e: scraping._fallback_scrape_html(e["html"])), None),
+    }
+    for tier, entries in by_tier.items():
+        stages[f"scrape_html.tier{tier}"] = (len(entries), each(entries, scrape_tier), None)
+    stages.update({
+        "extract_recipe": (len(corpus), each(corpus, extract), None),
+        "normalize_raw_ingredient": (len(lines), each(lines, scraping._normalize_raw_ingredient), None),
+        "parse_ingredient_string.cold": (len(distinct), each(distinct, recipe_logic.parse_ingredient_string), recipe_logic._PARSE_CACHE.clear),
+        "parse_ingredient_string.cached": (len(distinct), each(distinct, recipe_logic.parse_ingredient_string), None),
+        "convert_to_grams": (len(amounts), each(amounts, lambda a: recipe_logic.convert_to_grams(*a)), None),
+        "table_lookups": (len(names), each(names, lookups), None),
+        "calculate_recipe.cold": (len(corpus), each(corpus, calculate), None),
+    })
+    return stages
+
+
+def time_stage(ops, run, setup, repeats):
+    if setup:
+        setup()
+    run()  # warm-up: imports, lazily compiled patterns, parser model load
+    samples = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - started) * 1000)
+    per_op = [s / ops for s in samples]
+    return {
+        "ops": ops,
+        "repeats": repeats,
+        "total_ms": round(statistics.median(samples), 4),
+        "per_op_ms": round(statistics.median(per_op), 5),
+        "per_op_min_ms": round(min(per_op), 5),
+        "per_op_max_ms": round(max(per_op), 5),
+    }
+
+
+def _git_revision():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return rev + ("-dirty" if dirty else "")
+
+
+def _versions():
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def compare(results, baseline, threshold):
+    """Print per-stage changes against a baseline run; return regressed stage names."""
+    regressed = []
+    print(f"\nvs {baseline['meta'].get('git') or 'baseline'}  (threshold +{threshold:g}%)")
+    for name, stage in results["stages"].items():
+        old = baseline["stages"].get(name)
+        if old is None:
+            print(f"{name:<32} {'new':>12}")
+            continue
+        change = (stage["per_op_ms"] / old["per_op_ms"] - 1) * 100 if old["per_op_ms"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed.append(name)
+        print(f"{name:<32} {old['per_op_ms']:>10.4f} -> {stage['per_op_ms']:>10.4f} ms/op  {change:+7.1f}%{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline per-stage pipeline benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--stage", action="append", default=[],
+                        help="only run stages whose name contains this (repeatable)")
+    parser.add_argument("--json", type=pathlib.Path, help="write results to this file")
+    parser.add_argument("--compare", type=pathlib.Path, help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="percent slowdown per op that counts as a regression")
+    args = parser.parse_args()
+
+    corpus = offline.load_corpus()
+    adapter = offline.install(corpus, offline.load_usda_responses())
+
+    stages = build_stages(corpus)
+    results = {
+        "meta": {
+            "git": _git_revision(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "packages": _versions(),
+            "fallback_html_engine": scraping.FALLBACK_HTML_ENGINE,
+            "corpus": [entry["page"] for entry in corpus],
+        },
+        "stages": {},
+    }
+    for name, (ops, run, setup) in stages.items():
+        if args.stage and not any(s in name for s in args.stage):
+            continue
+        if not ops:
+            # e.g. no amounts when the parser finds no quantities; left out of --json / --compare
+            print(f"{name:<32} {ops:>5} ops  {'n/a':>10}")
+            continue
+        stage = results["stages"][name] = time_stage(ops, run, setup, args.repeat)
+        print(f"{name:<32} {stage['ops']:>5} ops  {stage['per_op_ms']:>10.4f} ms/op  "
+              f"(min {stage['per_op_min_ms']:.4f}, max {stage['per_op_max_ms']:.4f})  "
+              f"total {stage['total_ms']:.1f} ms")
+    results["meta"]["unrecorded_usda_queries"] = sorted(adapter.unrecorded)
+    if adapter.unrecorded:
+        print(f"warning: no recorded USDA response for {sorted(adapter.unrecorded)}", file=sys.stderr)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+    if args.compare:
+        regressed = compare(results, json.loads(args.compare.read_text()), args.threshold)
+        if regressed:
+            sys.exit(f"{len(regressed)} stage(s) regressed: {', '.join(regressed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Micro-benchmark: density / known-calorie / item-weight table lookups.
+
+Compares the compiled _KeyMatcher against the original per-key loops, first
+on the real tables and then with each table padded to a few thousand keys.
+Also checks that both give the same answer for every probe name.
+
+Run from the repo root:  python -m bench.bench_table_lookups
+"""
+
+import os
+import pathlib
+import random
+import re
+import string
+import timeit
+
+os.environ.setdefault("NLTK_DATA", str(pathlib.Path(__file__).parent.parent / "api" / "nltk_data"))
+
+from api.recipe_logic import (  # noqa: E402
+    DENSITY_G_PER_CUP,
+    KNOWN_KCAL_PER_100G,
+    WEIGHT_PER_ITEM,
+    _KeyMatcher,
+)
+
+NAMES = [
+    "all-purpose flour", "unsalted butter", "salted butter", "rice flour",
+    "light brown sugar", "extra virgin olive oil", "whole milk", "heavy cream",
+    "large eggs", "egg yolks", "eggplant", "yellow onion", "green onions",
+    "garlic cloves", "fresh ginger", "sweet potatoes", "red bell pepper",
+    "jalapeno pepper, seeded", "kosher salt", "freshly ground black pepper",
+    "boneless skinless chicken breasts", "chicken thighs", "ground beef",
+    "low-sodium chicken broth", "canned chickpeas, drained", "dried lentils",
+    "shredded mozzarella cheese", "grated parmesan cheese", "pure vanilla extract",
+    "baking soda", "baking powder", "ground cinnamon", "maple syrup", "honey",
+    "cocoa powder", "semisweet chocolate chips", "rolled oats", "white rice",
+    "cannellini beans, rinsed", "pappardelle", "ras el hanout", "swiss chard",
+    "puff pastry, thawed", "bay leaves", "fresh cilantro", "lemon juice",
+    "zucchini", "tomato paste", "coconut milk", "saffron threads", "quinoa",
+]
+
+
+def legacy_word_boundary(table, name):
+    best_key = None
+    best_len = 0
+    for key in table:
+        if re.search(r"\b" + re.escape(key) + r"\b", name):
+            if len(key) > best_len:
+                best_key = key
+                best_len = len(key)
+    return best_key
+
+
+def legacy_substring(table, name):
+    best_key = None
+    best_len = 0
+    for key in table:
+        if key in name:
+            if len(key) > best_len:
+                best_key = key
+                best_len = len(key)
+    return best_key
+
+
+def padded(table, size, rng):
+    """Copy of table with random multi-word keys added up to `size` entries."""
+    grown = dict(table)
+    while len(grown) < size:
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+                 for _ in range(rng.randint(1, 3))]
+        grown[" ".join(words)] = 1
+    return grown
+
+
+def bench(label, table, word_boundary, names, number):
+    legacy = legacy_word_boundary if word_boundary else legacy_substring
+    matcher = _KeyMatcher(table, word_boundary=word_boundary)
+    for name in names:
+        assert matcher.longest(name) == legacy(table, name), name
+    t_old = timeit.timeit(lambda: [legacy(table, n) for n in names], number=number)
+    t_new = timeit.timeit(lambda: [matcher.longest(n) for n in names], number=number)
+    per_old = t_old / (number * len(names)) * 1e6
+    per_new = t_new / (number * len(names)) * 1e6
+    print(f"{label:<28} {len(table):>6} keys  loop {per_old:8.2f} us  "
+          f"matcher {per_new:6.2f} us  x{per_old / per_new:5.1f}")
+
+
+def main():
+    rng = random.Random(0)
+    names = NAMES + [
+        " ".join(rng.sample(list(DENSITY_G_PER_CUP) + list(KNOWN_KCAL_PER_100G), 2))
+        for _ in range(50)
+    ]
+    tables = [
+        ("DENSITY_G_PER_CUP", DENSITY_G_PER_CUP, True),
+        ("KNOWN_KCAL_PER_100G", KNOWN_KCAL_PER_100G, True),
+        ("WEIGHT_PER_ITEM", WEIGHT_PER_ITEM, False),
+    ]
+    print("Current tables")
+    for label, table, word_boundary in tables:
+        bench(label, table, word_boundary, names, number=20)
+    # The legacy loop recompiles a regex per key, so keep this round small
+    print("Tables padded to 5000 keys")
+    for label, table, word_boundary in tables:
+        bench(label, padded(table, 5000, rng), word_boundary, names[:20], number=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Offline HTTP for the benchmarks: serves saved recipe pages and recorded
+USDA search responses from bench/fixtures instead of the network.
+
+install() mounts a FixtureAdapter on the shared sessions in api.fetch, so
+fetch_page() and the USDA lookups run their normal code paths. Import this
+before anything from api, so the page cache can be switched off first.
+"""
+
+import json
+import os
+import pathlib
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Benchmarks measure the work, not the caches: no page cache on disk
+os.environ["PAGE_CACHE_DB"] = ""
+os.environ.pop("PARSE_CACHE_DB", None)
+os.environ.pop("RESULT_CACHE_DB", None)
+os.environ.pop("USDA_LOCAL_DB", None)
+os.environ["USDA_BUDGET_DB"] = ""
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures"
+USDA_HOST = "api.nal.usda.gov"
+
+
+def load_corpus():
+    """Return the corpus entries (page, url, tier) with each page's html."""
+    corpus = json.loads((FIXTURES / "corpus.json").read_text())
+    for entry in corpus:
+        entry["html"] = (FIXTURES / "pages" / entry["page"]).read_text(encoding="utf-8")
+    return corpus
+
+
+def load_usda_responses():
+    return json.loads((FIXTURES / "usda_search.json").read_text())
+
+
+class FixtureAdapter(BaseAdapter):
+    """Answers GETs from fixtures: pages by URL, USDA searches by query.
+
+    Unknown pages get a 404; USDA queries with no recording get an empty
+    result and are noted in `unrecorded`.
+    """
+
+    def __init__(self, pages, usda_responses):
+        super().__init__()
+        self.pages = pages
+        self.usda_responses = usda_responses
+        self.unrecorded = set()
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        if parts.netloc == USDA_HOST:
+            query = parse_qs(parts.query).get("query", [""])[0]
+            if query not in self.usda_responses:
+                self.unrecorded.add(query)
+            body = json.dumps(self.usda_responses.get(query, {"foods": []}))
+            return self._response(request, 200, body, "application/json")
+        html = self.pages.get(request.url)
+        if html is None:
+            return self._response(request, 404, "Not Found", "text/plain")
+        return self._response(request, 200, html, "text/html; charset=utf-8")
+
+    def _response(self, request, status, body, content_type):
+        resp = requests.Response()
+        resp.status_code = status
+        resp.reason = "OK" if status == 200 else "Not Found"
+        resp.headers = CaseInsensitiveDict({"Content-Type": content_type})
+        resp._content = body.encode("utf-8")
+        resp.encoding = "utf-8"
+        resp.url = request.url
+        resp.request = request
+        return resp
+
+    def close(self):
+        pass
+
+
+def install(corpus, usda_responses):
+    """Route the api.fetch sessions through a FixtureAdapter and return it."""
+    from api.fetch import PAGE_SESSION, USDA_SESSION
+
+    adapter = FixtureAdapter({entry["url"]: entry["html"] for entry in corpus}, usda_responses)
+    for session in (PAGE_SESSION, USDA_SESSION):
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+    return adapter
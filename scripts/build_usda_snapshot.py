@@ -0,0 +1,136 @@
+"""
+Build the USDA lookup snapshot deployed with the functions (api/usda_snapshot.tsv).
+
+Collects ingredient names from any mix of sources, keeps the most common
+ones the built-in tables don't already answer, and resolves each through
+search_usda_calories() (name cleaning, USDA API or USDA_LOCAL_DB) once.
+Every result the runtime would cache, misses included, goes into a sorted
+SnapshotFile keyed by cleaned name; transient USDA errors are left out.
+The build ignores the app's hourly budget (USDA_BUDGET_*) and fails,
+writing nothing, if USDA rate-limits it; lower --top or rerun later.
+
+Sources:
+  --lines FILE      ingredient lines, one per line
+  --urls FILE       recipe URLs as JSONL, the same input scripts.bulk_process takes
+  --cassettes DIR   queries from USDA traffic saved with HTTP_MODE=record
+
+Rebuild it after changing _clean_ingredient_name(), since entries are
+keyed by its output. Usage (from the repo root):
+  USDA_API_KEY=... python -m scripts.build_usda_snapshot --urls urls.jsonl --top 2000
+"""
+
+import argparse
+import collections
+import json
+import os
+import pathlib
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = pathlib.Path(__file__).parent.parent
+DEFAULT_OUTPUT = ROOT / "api" / "usda_snapshot.tsv"
+
+# Resolve against USDA itself, not a previous snapshot, and don't stop at
+# the serving budget: a 429 from USDA still fails the build below
+os.environ["USDA_SNAPSHOT"] = ""
+os.environ["USDA_BUDGET_DB"] = ""
+os.environ.setdefault("NLTK_DATA", str(ROOT / "api" / "nltk_data"))
+
+from api import recipe_logic  # noqa: E402
+from api.cache import write_snapshot  # noqa: E402
+from api.scraping import scrape_recipe  # noqa: E402
+from scripts.bulk_process import read_tasks  # noqa: E402
+
+
+def names_from_lines(lines):
+    lines = [line.strip() for line in lines if line.strip()]
+    return [parsed["name"] for parsed in recipe_logic.parse_ingredient_list(lines) if parsed["name"]]
+
+
+def names_from_urls(source):
+    lines = []
+    for task in read_tasks(source):
+        if len(task) == 2:
+            continue
+        try:
+            lines.extend(scrape_recipe(task[2])["ingredients"])
+        except Exception as e:
+            print(f"skipping {task[2]}: {e}", file=sys.stderr)
+    return names_from_lines(lines)
+
+
+def names_from_cassettes(directory):
+    names = []
+    for path in sorted(pathlib.Path(directory, "usda").glob("*.json")):
+        url = json.loads(path.read_text(encoding="utf-8"))["url"]
+        names.extend(parse_qs(urlsplit(url).query).get("query", []))
+    return names
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", action="append", default=[], help="file of ingredient lines (repeatable)")
+    parser.add_argument("--urls", action="append", default=[], help="JSONL file of recipe URLs (repeatable)")
+    parser.add_argument("--cassettes", action="append", default=[], help="HTTP_CASSETTE_DIR of recorded traffic (repeatable)")
+    parser.add_argument("--top", type=int, default=2000, help="most common names to resolve")
+    parser.add_argument("--workers", type=int, default=recipe_logic.USDA_MAX_WORKERS)
+    parser.add_argument("-o", "--output", type=pathlib.Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    if not (args.lines or args.urls or args.cassettes):
+        parser.error("give at least one of --lines, --urls, --cassettes")
+    api_key = os.environ.get("USDA_API_KEY")
+    if not (api_key or recipe_logic.USDA_LOCAL_DB):
+        parser.error("needs USDA_API_KEY or USDA_LOCAL_DB")
+
+    names = []
+    for path in args.lines:
+        with open(path, encoding="utf-8") as f:
+            names.extend(names_from_lines(f))
+    for path in args.urls:
+        with open(path, encoding="utf-8") as f:
+            names.extend(names_from_urls(f))
+    for directory in args.cassettes:
+        names.extend(names_from_cassettes(directory))
+
+    # Count by cleaned name, the key search_usda_calories caches under;
+    # the built-in table answers its names before any lookup anyway
+    counts = collections.Counter()
+    example = {}
+    for name in names:
+        cleaned = recipe_logic._clean_ingredient_name(name)
+        if not cleaned or recipe_logic._check_known_calories(cleaned)[0] is not None:
+            continue
+        counts[cleaned] += 1
+        example.setdefault(cleaned, name)
+    chosen = [cleaned for cleaned, _count in counts.most_common(args.top)]
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        # An invalid key raises here and stops the build
+        results = list(pool.map(lambda cleaned: recipe_logic.search_usda_calories(example[cleaned], api_key), chosen))
+    # Rate-limited names come back as uncached "not looked up" misses
+    limited = [cleaned for cleaned, (kcal, description) in zip(chosen, results)
+               if kcal is None and description.startswith("not looked up")]
+    if limited:
+        sys.exit(f"USDA rate-limited {len(limited)} of {len(chosen)} lookups (e.g. {limited[0]!r}); "
+                 f"no snapshot written. Lower --top or rerun after the limit resets.")
+
+    # Read the results themselves, not _USDA_CACHE: with --top above
+    # USDA_CACHE_SIZE it would have evicted some already
+    rows = {}
+    for cleaned, (kcal, description) in zip(chosen, results):
+        if kcal is None and description.startswith(recipe_logic._UNCACHED_MISS_REASONS):
+            continue  # transient USDA error, which the runtime doesn't cache either
+        rows[cleaned] = ["" if kcal is None else repr(kcal), description]
+    write_snapshot(args.output, rows)
+
+    found = sum(1 for kcal, _description in rows.values() if kcal)
+    print(f"{len(names)} names, {len(counts)} distinct needing USDA; wrote {len(rows)} of the top "
+          f"{len(chosen)} ({found} with kcal, {len(rows) - found} misses, "
+          f"{len(chosen) - len(rows)} left out after errors) to {args.output} "
+          f"({args.output.stat().st_size} bytes)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
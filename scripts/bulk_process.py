@@ -0,0 +1,149 @@
+"""
+Bulk-process recipe URLs offline across a pool of worker processes.
+
+Reads JSONL where each line is a JSON object with a "url" field (an "id"
+field is carried through to the output) or a bare JSON string. Each URL
+goes through calculate_recipe() or scrape_cook_data(), and one JSONL
+result is written per input line as soon as it's done, so the output
+order is completion order; use "line" (1-based input line number) to
+join back. Failures are classified with error_response(), the same way
+the endpoints classify them. A throughput / failure summary goes to stderr.
+
+Each worker has its own in-memory caches; set PARSE_CACHE_DB (and leave
+PAGE_CACHE_DB on) so workers share parsed lines and pages through SQLite.
+
+Usage (from the repo root):
+  python -m scripts.bulk_process urls.jsonl -o results.jsonl --mode calculate --workers 8
+"""
+
+import argparse
+import collections
+import json
+import os
+import pathlib
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from api.records import dumps
+
+ROOT = pathlib.Path(__file__).parent.parent
+
+# Set by _init_worker in each worker process
+_worker = {}
+
+
+def _init_worker(mode):
+    # Same bundled NLTK data the serverless functions use, unless overridden
+    os.environ.setdefault("NLTK_DATA", str(ROOT / "api" / "nltk_data"))
+    from api.scraping import error_response, scrape_cook_data
+
+    _worker["error_response"] = error_response
+    if mode == "cook":
+        _worker["run"] = scrape_cook_data
+        _worker["generic_error"] = "Something went wrong while loading this recipe."
+    else:
+        from api.recipe_logic import calculate_recipe
+
+        api_key = os.environ.get("USDA_API_KEY")
+        _worker["run"] = lambda url: calculate_recipe(url, api_key)
+        _worker["generic_error"] = "Something went wrong while analyzing this recipe."
+
+
+def _process(task):
+    line_no, record_id, url = task
+    out = {"line": line_no, "url": url}
+    if record_id is not None:
+        out["id"] = record_id
+    started = time.perf_counter()
+    try:
+        result = _worker["run"](url)
+    except Exception as e:
+        status, payload = _worker["error_response"](e, _worker["generic_error"])
+        out.update(ok=False, status=status, **payload)
+    else:
+        out.update(ok=True, result=result)
+    out["seconds"] = round(time.perf_counter() - started, 3)
+    return out
+
+
+def read_tasks(lines):
+    """Yield (line_no, id, url) tasks, or (line_no, error) for unusable lines."""
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            yield line_no, "invalid JSON"
+            continue
+        if isinstance(record, str):
+            record = {"url": record}
+        url = record.get("url") if isinstance(record, dict) else None
+        if not isinstance(url, str) or not url.strip().startswith(("http://", "https://")):
+            yield line_no, "missing or invalid 'url'"
+            continue
+        yield line_no, record.get("id"), url.strip()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="JSONL file of URLs, or - for stdin")
+    parser.add_argument("-o", "--output", help="JSONL results file (default: stdout)")
+    parser.add_argument("--mode", choices=("calculate", "cook"), default="calculate")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--max-pending", type=int, default=0,
+                        help="URLs queued ahead of the workers (default: 4 per worker)")
+    args = parser.parse_args(argv)
+
+    if args.mode == "calculate" and not (os.environ.get("USDA_API_KEY") or os.environ.get("USDA_LOCAL_DB")):
+        parser.error("calculate mode needs USDA_API_KEY or USDA_LOCAL_DB")
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    max_pending = args.max_pending or 4 * args.workers
+
+    counts = collections.Counter()
+    errors = collections.Counter()
+    started = time.perf_counter()
+
+    def emit(out):
+        sink.write(dumps(out).decode("utf-8") + "\n")
+        sink.flush()
+        counts["ok" if out["ok"] else "failed"] += 1
+        if not out["ok"]:
+            errors[f"{out['status']} {out['error']}"] += 1
+
+    # Keep a bounded number of tasks in flight so huge inputs stream
+    # through instead of being read (and pickled) up front.
+    with source, ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(args.mode,)) as pool:
+        pending = set()
+        for task in read_tasks(source):
+            if len(task) == 2:
+                emit({"line": task[0], "ok": False, "status": 400, "error": task[1]})
+                continue
+            pending.add(pool.submit(_process, task))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    emit(future.result())
+        for future in wait(pending).done:
+            emit(future.result())
+
+    if sink is not sys.stdout:
+        sink.close()
+
+    elapsed = time.perf_counter() - started
+    total = counts["ok"] + counts["failed"]
+    print(f"{total} URLs in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.2f}/s) "
+          f"with {args.workers} workers: {counts['ok']} ok, {counts['failed']} failed",
+          file=sys.stderr)
+    for error, count in errors.most_common(10):
+        print(f"  {count:>6}  {error}", file=sys.stderr)
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Local stand-in for the USDA FoodData Central search API, for load tests.
+
+Serves GET <prefix>/foods/search in the same shape as api.nal.usda.gov:
+recorded responses from bench/fixtures/usda_search.json (or --fixtures)
+by query, and for any other query either an empty result or, with
+--synthesize, a made-up food whose kcal is derived from the query so
+repeated runs agree. Latency, error injection and an hourly-style rate
+limit can be turned on to exercise the slow and failing paths of
+search_usda_calories().
+
+Point the app at it with USDA_BASE:
+  python -m scripts.usda_stub --port 8790 --latency 80 --jitter 40 --error 429=0.02 --error 503=0.01
+  USDA_BASE=http://127.0.0.1:8790/fdc/v1 USDA_API_KEY=stub python -m scripts.bulk_process urls.jsonl
+
+The app's own hourly budget (USDA_BUDGET_*) still applies against the stub;
+set USDA_BUDGET_PER_HOUR to match --rate-limit, or USDA_BUDGET_DB="" to
+measure without it.
+"""
+
+import argparse
+import json
+import pathlib
+import random
+import threading
+import time
+import zlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = pathlib.Path(__file__).parent.parent
+DEFAULT_FIXTURES = ROOT / "bench" / "fixtures" / "usda_search.json"
+
+# Bodies in the shape api.data.gov sends for each injected status
+ERROR_BODIES = {
+    403: {"error": {"code": "API_KEY_INVALID", "message": "An invalid api_key was supplied."}},
+    429: {"error": {"code": "OVER_RATE_LIMIT", "message": "You have exceeded your rate limit."}},
+}
+
+
+def synthetic_food(query):
+    """A stable fake SR Legacy food for a query with no recording."""
+    seed = zlib.crc32(query.encode("utf-8"))
+    return {
+        "fdcId": 900000 + seed % 100000,
+        "description": f"{query.capitalize()}, raw",
+        "dataType": "SR Legacy",
+        "foodNutrients": [
+            {"nutrientId": 1008, "nutrientName": "Energy", "nutrientNumber": "208",
+             "unitName": "KCAL", "value": 20 + seed % 600},
+        ],
+    }
+
+
+class RateLimiter:
+    """At most `limit` requests in any `window` seconds (0 = unlimited)."""
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.times = deque()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Return (allowed, remaining)."""
+        if not self.limit:
+            return True, None
+        now = time.monotonic()
+        with self.lock:
+            while self.times and now - self.times[0] >= self.window:
+                self.times.popleft()
+            if len(self.times) >= self.limit:
+                return False, 0
+            self.times.append(now)
+            return True, self.limit - len(self.times)
+
+
+def make_handler(args, responses):
+    rng = random.Random(args.seed)
+    rng_lock = threading.Lock()
+    limiter = RateLimiter(args.rate_limit, args.rate_window)
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, data, remaining=None):
+            body = json.dumps(data).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if args.rate_limit:
+                self.send_header("X-RateLimit-Limit", str(args.rate_limit))
+                self.send_header("X-RateLimit-Remaining", str(remaining or 0))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            if not parts.path.rstrip("/").endswith("/foods/search"):
+                self._send_json(404, {"error": "Not Found"})
+                return
+            params = parse_qs(parts.query)
+
+            with rng_lock:
+                delay = max(0.0, args.latency + rng.uniform(-args.jitter, args.jitter)) / 1000
+                roll = rng.random()
+            time.sleep(delay)
+
+            api_key = params.get("api_key", [""])[0]
+            if not api_key or (args.api_key and api_key != args.api_key):
+                self._send_json(403, ERROR_BODIES[403])
+                return
+            allowed, remaining = limiter.acquire()
+            if not allowed:
+                self._send_json(429, ERROR_BODIES[429], remaining)
+                return
+            # Injected failures: each status takes its own slice of [0, 1)
+            for status, rate in args.error:
+                if roll < rate:
+                    self._send_json(status, ERROR_BODIES.get(status, {"error": f"HTTP {status}"}), remaining)
+                    return
+                roll -= rate
+
+            query = params.get("query", [""])[0]
+            page_size = int(params.get("pageSize", ["50"])[0])
+            data = responses.get(query)
+            if data is None:
+                foods = [synthetic_food(query)] if args.synthesize and query else []
+                data = {"totalHits": len(foods), "currentPage": 1, "totalPages": 1, "foods": foods}
+            self._send_json(200, {**data, "foods": data.get("foods", [])[:page_size]}, remaining)
+
+        def log_message(self, format, *log_args):
+            if args.verbose:
+                super().log_message(format, *log_args)
+
+    return StubHandler
+
+
+def _error_spec(value):
+    status, _, rate = value.partition("=")
+    try:
+        return int(status), float(rate)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected STATUS=RATE, e.g. 429=0.05, got {value!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--fixtures", type=pathlib.Path, default=DEFAULT_FIXTURES,
+                        help="JSON object of query -> recorded search response")
+    parser.add_argument("--synthesize", action="store_true",
+                        help="answer unrecorded queries with a made-up food instead of no results")
+    parser.add_argument("--latency", type=float, default=0.0, help="mean response delay in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="delay varies uniformly by +/- this many ms")
+    parser.add_argument("--error", type=_error_spec, action="append", default=[], metavar="STATUS=RATE",
+                        help="fail this fraction of requests with STATUS (repeatable), e.g. 500=0.01")
+    parser.add_argument("--rate-limit", type=int, default=0,
+                        help="requests allowed per --rate-window before 429s (0 = no limit)")
+    parser.add_argument("--rate-window", type=float, default=3600.0, help="rate limit window in seconds")
+    parser.add_argument("--api-key", help="only accept this api_key (default: any non-empty key)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for latency and error injection")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    responses = json.loads(args.fixtures.read_text()) if args.fixtures else {}
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args, responses))
+    server.daemon_threads = True
+    print(f"USDA stub on http://{args.host}:{server.server_address[1]}/fdc/v1 "
+          f"({len(responses)} recorded queries)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
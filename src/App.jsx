@@ -111,12 +111,7 @@ export default function App() {
 
   const loading = mode === 'cook' ? cookLoading : nutritionLoading
 
-  async function fetchEndpoint(endpoint, url) {
-    const res = await fetch(endpoint, {
-      method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ url }),
-    })
+  async function readJsonResponse(res, url) {
     const rawText = await res.text()
     let data
     try {
@@ -130,6 +125,72 @@ export default function App() {
     return data
   }
 
+  // Streams /api/recipe as NDJSON events: cook mode data first, passed to
+  // onCook, then the calorie events, calling onUpdate with the partial
+  // recipe after each one. One request, so the page is fetched and scraped
+  // once for both views. Resolves to the finished recipe.
+  async function streamRecipe(url, onCook, onUpdate) {
+    const res = await fetch('/api/recipe', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ url, stream: true, debug: debugEnabled }),
+    })
+    if (!res.ok || !(res.headers.get('Content-Type') || '').includes('ndjson')) {
+      const data = await readJsonResponse(res, url)
+      onCook(res.status, data.cook)
+      if (data.nutrition.error) {
+        throw { userError: data.nutrition.error, debug: { status: res.status, url, body: JSON.stringify(data), server: data.nutrition.debug } }
+      }
+      return data.nutrition
+    }
+
+    let partial = null
+    let rawText = ''
+    function handleEvent(event) {
+      if (event.type === 'cook') {
+        onCook(event.status, event.cook)
+        return
+      }
+      if (event.type === 'recipe') {
+        partial = {
+          title: event.title,
+          servings: event.servings,
+          total_kcal: 0,
+          per_serving: null,
+          ingredients: Array(event.ingredient_count).fill(null),
+        }
+      } else if (event.type === 'ingredient') {
+        const ingredients = [...partial.ingredients]
+        ingredients[event.index] = event.ingredient
+        partial = { ...partial, ingredients, total_kcal: partial.total_kcal + (event.ingredient.total_kcal || 0) }
+      } else if (event.type === 'totals') {
+        partial = { ...partial, total_kcal: event.total_kcal, per_serving: event.per_serving }
+      } else if (event.type === 'error') {
+        throw { userError: event.error || 'Something went wrong.', debug: { status: res.status, url, body: rawText, server: event.debug } }
+      }
+      onUpdate(partial)
+    }
+
+    const reader = res.body.pipeThrough(new TextDecoderStream()).getReader()
+    let buffered = ''
+    for (;;) {
+      const { value, done } = await reader.read()
+      if (done) break
+      rawText += value
+      buffered += value
+      const lines = buffered.split('\n')
+      buffered = lines.pop()
+      for (const line of lines) {
+        if (line.trim()) handleEvent(JSON.parse(line))
+      }
+    }
+    if (buffered.trim()) handleEvent(JSON.parse(buffered))
+    if (!partial || partial.ingredients.includes(null)) {
+      throw { userError: 'The server stopped before the recipe was finished.', debug: { status: res.status, url, body: rawText } }
+    }
+    return partial
+  }
+
   function handleAnalyze(url) {
     setError(null)
     setDebug(null)
@@ -140,25 +201,31 @@ export default function App() {
     setCookLoading(true)
     setNutritionLoading(true)
 
-    fetchEndpoint('/api/cook', url)
-      .then((data) => setCookData(data))
-      .catch((err) => {
-        if (mode === 'cook') {
-          setError(err.userError || 'Failed to connect to server.')
-          setDebug(err.debug || { status: null, url, body: String(err) })
-        }
-      })
-      .finally(() => setCookLoading(false))
+    let cookDone = false
+    function handleCook(status, data) {
+      cookDone = true
+      setCookLoading(false)
+      if (!data.error) {
+        setCookData(data)
+      } else if (mode === 'cook') {
+        setError(data.error)
+        setDebug({ status, url, body: JSON.stringify(data), server: data.debug })
+      }
+    }
 
-    fetchEndpoint('/api/calculate', url)
+    streamRecipe(url, handleCook, setRecipe)
       .then((data) => setRecipe(data))
       .catch((err) => {
-        if (mode === 'nutrition') {
+        // Before the cook event, the error stands for both views
+        if (mode === 'nutrition' || !cookDone) {
           setError(err.userError || 'Failed to connect to server.')
           setDebug(err.debug || { status: null, url, body: String(err) })
         }
       })
-      .finally(() => setNutritionLoading(false))
+      .finally(() => {
+        setCookLoading(false)
+        setNutritionLoading(false)
+      })
   }
 
   function handleSelectFavorite(fav) {
@@ -219,7 +286,7 @@ export default function App() {
               onModeChange={setMode}
             />
 
-            {loading && !error && <LoadingIndicator />}
+            {loading && !error && !(mode === 'nutrition' && recipe) && <LoadingIndicator />}
 
             {!loading && error && (
               <Alert severity="error" variant="outlined">
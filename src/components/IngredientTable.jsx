@@ -4,6 +4,7 @@ import Typography from '@mui/material/Typography'
 import Box from '@mui/material/Box'
 import Stack from '@mui/material/Stack'
 import Chip from '@mui/material/Chip'
+import LinearProgress from '@mui/material/LinearProgress'
 import DevLabel from './DevLabel'
 
 const STATUS_COLORS = {
@@ -87,6 +88,9 @@ function IngredientRow({ ingredient, scale }) {
 }
 
 export default function IngredientTable({ ingredients, scale }) {
+  // Rows still being looked up while /api/calculate streams are null
+  const pending = ingredients.filter((ing) => ing == null).length
+
   return (
     <Card sx={{ position: 'relative' }}>
       <DevLabel name="Content" />
@@ -98,9 +102,20 @@ export default function IngredientTable({ ingredients, scale }) {
         >
           Ingredient Breakdown
         </Typography>
+        {pending > 0 && (
+          <Box sx={{ mb: 1.5 }}>
+            <LinearProgress
+              variant="determinate"
+              value={((ingredients.length - pending) / ingredients.length) * 100}
+            />
+            <Typography variant="caption" color="text.secondary">
+              Looking up {pending} more ingredient{pending === 1 ? '' : 's'}...
+            </Typography>
+          </Box>
+        )}
         <Stack spacing={1}>
           {ingredients.map((ing, i) => (
-            <IngredientRow key={i} ingredient={ing} scale={scale} />
+            ing && <IngredientRow key={i} ingredient={ing} scale={scale} />
           ))}
         </Stack>
       </CardContent>
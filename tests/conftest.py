@@ -0,0 +1,70 @@
+"""
+Shared fixtures: the api modules run against bench/fixtures (saved pages
+and USDA responses) through bench.offline, with every cache emptied
+before each test. Run from the repo root:  python -m pytest tests
+"""
+
+import os
+import pathlib
+from urllib.parse import urlsplit
+
+import pytest
+
+from bench import offline  # noqa: I001 — must come before api (page cache off)
+
+os.environ["USDA_SNAPSHOT"] = ""
+os.environ.setdefault("NLTK_DATA", str(pathlib.Path(__file__).parent.parent / "api" / "nltk_data"))
+
+from api import recipe_logic, scraping  # noqa: E402
+
+
+class CountingAdapter(offline.FixtureAdapter):
+    """FixtureAdapter that counts the requests it answers, per host."""
+
+    def __init__(self, pages, usda_responses):
+        super().__init__(pages, usda_responses)
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request.url)
+        return super().send(request, **kwargs)
+
+    def count(self, host):
+        return sum(1 for url in self.requests if urlsplit(url).netloc == host)
+
+    @property
+    def usda_calls(self):
+        return self.count(offline.USDA_HOST)
+
+
+@pytest.fixture
+def corpus():
+    return offline.load_corpus()
+
+
+@pytest.fixture
+def http(corpus):
+    """Offline HTTP for the api sessions; returns the CountingAdapter."""
+    from api.fetch import PAGE_SESSION, USDA_SESSION
+
+    adapter = CountingAdapter({entry["url"]: entry["html"] for entry in corpus}, offline.load_usda_responses())
+    for session in (PAGE_SESSION, USDA_SESSION):
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+    return adapter
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    caches = [
+        scraping._EXTRACT_CACHE,
+        recipe_logic._PARSE_CACHE,
+        recipe_logic._USDA_CACHE,
+        recipe_logic._RECENT_RECIPES,
+        recipe_logic._RESULT_CACHE,
+    ]
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
@@ -0,0 +1,48 @@
+"""calculate_from_lines(): reuse of a client's earlier results."""
+
+import pytest
+
+from api import recipe_logic
+
+API_KEY = "test"
+
+
+def _previous(**fields):
+    return [{"raw": "1 cup sugar", "name": "sugar", "grams": 200.0, "kcal_per_100g": 387.0,
+             "total_kcal": 774.0, "usda_match": "Sugars, granulated", "status": "ok", "note": "", **fields}]
+
+
+def _calculated_lines(monkeypatch, previous):
+    looked_up = []
+    original = recipe_logic._calculate_group
+
+    def spy(parsed_all, indexes, api_key):
+        looked_up.extend(parsed_all[i]["raw"] for i in indexes)
+        return original(parsed_all, indexes, api_key)
+
+    monkeypatch.setattr(recipe_logic, "_calculate_group", spy)
+    result = recipe_logic.calculate_from_lines(["1 cup sugar", "2 large eggs"], API_KEY, previous=previous)
+    return result, looked_up
+
+
+def test_unchanged_lines_are_reused(http, monkeypatch):
+    result, looked_up = _calculated_lines(monkeypatch, _previous())
+    assert looked_up == ["2 large eggs"]
+    assert result.ingredients[0].total_kcal == 774.0
+
+
+@pytest.mark.parametrize("note", [
+    "USDA API error (HTTP 503)",
+    "not looked up: USDA hourly request budget used up",
+])
+def test_transient_misses_are_looked_up_again(http, monkeypatch, note):
+    previous = _previous(status="not found", note=note, total_kcal=None, kcal_per_100g=None, usda_match=None)
+    _result, looked_up = _calculated_lines(monkeypatch, previous)
+    assert sorted(looked_up) == ["1 cup sugar", "2 large eggs"]
+
+
+def test_lasting_misses_are_reused(http, monkeypatch):
+    previous = _previous(status="not found", note="not found in USDA database", total_kcal=None,
+                         kcal_per_100g=None, usda_match=None)
+    _result, looked_up = _calculated_lines(monkeypatch, previous)
+    assert looked_up == ["2 large eggs"]
@@ -0,0 +1,40 @@
+"""Local FoodData Central store: building it, and errors."""
+
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+from api.fdc_local import search_local_foods
+from api.scraping import error_response
+
+ROOT = pathlib.Path(__file__).parent.parent
+
+
+def test_missing_store_is_a_server_error(tmp_path):
+    missing = tmp_path / "fdc.sqlite"
+    with pytest.raises(FileNotFoundError) as raised:
+        search_local_foods(str(missing), "flour")
+    status, payload = error_response(raised.value, "Something went wrong.")
+    assert status == 500
+    assert payload["error"] == "Something went wrong."
+
+
+def test_build_runs_without_recipe_logic(tmp_path):
+    csv_dir = tmp_path / "sr_legacy"
+    csv_dir.mkdir()
+    (csv_dir / "nutrient.csv").write_text('id,name,unit_name,nutrient_nbr\n1008,Energy,KCAL,208.0\n', encoding="utf-8")
+    (csv_dir / "food.csv").write_text('fdc_id,data_type,description\n1,sr_legacy_food,"Flour, wheat"\n', encoding="utf-8")
+    (csv_dir / "food_nutrient.csv").write_text('id,fdc_id,nutrient_id,amount\n1,1,1008,364\n', encoding="utf-8")
+
+    # A fresh interpreter, so modules imported by other tests don't count
+    code = (
+        "import sys\n"
+        "from api import fdc_local\n"
+        f"print(fdc_local.build_database({str(tmp_path / 'fdc.sqlite')!r}, [{str(csv_dir)!r}]))\n"
+        "print('api.recipe_logic' in sys.modules)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    assert out.split() == ["1", "False"]
+    assert search_local_foods(str(tmp_path / "fdc.sqlite"), "flour")[0]["description"] == "Flour, wheat"
@@ -0,0 +1,40 @@
+"""Recording and replaying HTTP traffic (HTTP_MODE)."""
+
+import requests
+from requests.adapters import BaseAdapter
+
+from api import fetch
+
+URL = "https://example.com/recipe"
+
+
+class ScriptedAdapter(BaseAdapter):
+    """Answers each request with the next (status, body) pair."""
+
+    def __init__(self, answers):
+        super().__init__()
+        self.answers = list(answers)
+
+    def send(self, request, **kwargs):
+        status, body = self.answers.pop(0)
+        resp = requests.Response()
+        resp.status_code = status
+        resp._content = body.encode("utf-8")
+        resp.encoding = "utf-8"
+        resp.request = request
+        return resp
+
+    def close(self):
+        pass
+
+
+def test_304_does_not_replace_the_recording(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetch, "HTTP_CASSETTE_DIR", str(tmp_path))
+    session = requests.Session()
+    session.mount("https://", fetch.CassetteAdapter("pages", ScriptedAdapter([(200, "<html>page</html>"), (304, "")])))
+    session.get(URL)
+    assert session.get(URL, headers={"If-None-Match": '"v1"'}).status_code == 304
+
+    monkeypatch.setattr(fetch, "HTTP_MODE", "replay")
+    replayed = session.get(URL)
+    assert (replayed.status_code, replayed.text) == (200, "<html>page</html>")
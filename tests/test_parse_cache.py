@@ -0,0 +1,57 @@
+"""The parse memo's SQLite copy."""
+
+import os
+import pathlib
+import subprocess
+import sys
+
+from api import recipe_logic
+from api.cache import DiskCache
+from api.scraping import NORMALIZATION_VERSION
+
+ROOT = pathlib.Path(__file__).parent.parent
+LINES = ["2 cups all-purpose flour", "1 tsp salt", "3 large eggs", "1 tsp salt"]
+
+
+def _plain(parsed):
+    # Units read back from disk belong to our pint registry, not the parser's
+    return [(p["raw"], p["name"], p["size"], [(q, str(u)) for q, u in p["amounts"]]) for p in parsed]
+
+
+def test_one_disk_write_per_list(tmp_path, monkeypatch):
+    disk = DiskCache(str(tmp_path / "parse.sqlite"), "parse-test")
+    writes = []
+    set_many = disk.set_many
+    monkeypatch.setattr(disk, "set_many", lambda items: writes.append(list(items)) or set_many(writes[-1]))
+    monkeypatch.setattr(recipe_logic, "_PARSE_DISK_CACHE", disk)
+
+    parsed = recipe_logic.parse_ingredient_list(LINES)
+    assert len(writes) == 1
+    assert sorted(raw for raw, _value in writes[0]) == sorted(set(LINES))
+
+    # Another worker reads them back from disk
+    recipe_logic._PARSE_CACHE.clear()
+    assert _plain(recipe_logic.parse_ingredient_list(LINES)) == _plain(parsed)
+    assert len(writes) == 1
+
+
+def test_failed_parses_are_not_kept(tmp_path, monkeypatch):
+    disk = DiskCache(str(tmp_path / "parse.sqlite"), "parse-test")
+    monkeypatch.setattr(recipe_logic, "_PARSE_DISK_CACHE", disk)
+    parse = recipe_logic.parse_ingredient
+    monkeypatch.setattr(recipe_logic, "parse_ingredient", lambda line: 1 / 0)  # e.g. NLTK data missing
+    assert recipe_logic.parse_ingredient_list(LINES[:1])[0]["amounts"] == ()
+    assert disk.get(LINES[0]) is None
+
+    monkeypatch.setattr(recipe_logic, "parse_ingredient", parse)
+    assert recipe_logic.parse_ingredient_list(LINES[:1])[0]["amounts"] != ()
+
+
+def test_namespace_follows_normalization_version(tmp_path):
+    # A fresh interpreter, so the module-level DiskCache is built from PARSE_CACHE_DB
+    env = {**os.environ, "PARSE_CACHE_DB": str(tmp_path / "parse.sqlite"), "USDA_SNAPSHOT": ""}
+    namespace = subprocess.run(
+        [sys.executable, "-c", "from api import recipe_logic; print(recipe_logic._PARSE_DISK_CACHE.namespace)"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    assert namespace.endswith(f"-n{NORMALIZATION_VERSION}")
@@ -0,0 +1,134 @@
+"""Page, result and coalescing caches around calculate_recipe()."""
+
+import threading
+import time
+
+from api import recipe_logic, scraping
+from api.cache import DiskCache
+
+API_KEY = "test"
+
+
+def _page_host(entry):
+    return entry["url"].split("/")[2]
+
+
+def test_repeated_stream_replays_without_usda_calls(http, corpus):
+    url = corpus[0]["url"]
+    first = list(recipe_logic.stream_recipe_calories(url, API_KEY))
+    assert http.usda_calls > 0
+
+    # Within the coalescing grace period
+    calls = http.usda_calls
+    again = list(recipe_logic.stream_recipe_calories(url, API_KEY))
+    assert http.usda_calls == calls
+
+    # Later, from the result cache: no recent run, no USDA cache either
+    recipe_logic._RECENT_RECIPES.clear()
+    recipe_logic._USDA_CACHE.clear()
+    cached = list(recipe_logic.stream_recipe_calories(url, API_KEY))
+    assert http.usda_calls == calls
+
+    totals = [events[-1] for events in (first, again, cached)]
+    assert totals[0] == totals[1] == totals[2]
+    assert [e["type"] for e in cached] == ["recipe"] + ["ingredient"] * (len(cached) - 2) + ["totals"]
+    by_index = {e["index"]: e["ingredient"].to_wire() for e in first if e["type"] == "ingredient"}
+    assert [e["ingredient"].to_wire() for e in cached[1:-1]] == [by_index[i] for i in range(len(by_index))]
+
+
+def test_stream_then_calculate_share_one_run(http, corpus):
+    url = corpus[0]["url"]
+    events = list(recipe_logic.stream_recipe_calories(url, API_KEY))
+    calls = http.usda_calls
+    result = recipe_logic.calculate_recipe(url, API_KEY)
+    assert http.usda_calls == calls
+    assert result.total_kcal == events[-1]["total_kcal"]
+
+
+def test_cook_then_calculate_fetches_page_once(http, corpus):
+    entry = corpus[0]
+    scraping.scrape_cook_data(entry["url"])
+    recipe_logic.calculate_recipe(entry["url"], API_KEY)
+    assert http.count(_page_host(entry)) == 1
+
+
+def test_cached_result_skips_scraping(http, corpus, monkeypatch):
+    url = corpus[0]["url"]
+    first = recipe_logic.calculate_recipe(url, API_KEY)
+
+    # Later: the page is fetched again, but its result is cached
+    scraping._EXTRACT_CACHE.clear()
+    recipe_logic._RECENT_RECIPES.clear()
+    scrapes = []
+    monkeypatch.setattr(scraping, "scrape_html", lambda *a, **kw: scrapes.append(a) or 1 / 0)
+    monkeypatch.setattr(scraping, "_fallback_scrape_html", lambda html: scrapes.append(html) or 1 / 0)
+    again = recipe_logic.calculate_recipe(url, API_KEY)
+    assert scrapes == []
+    assert again.total_kcal == first.total_kcal
+
+
+def test_changed_page_is_scraped_again(http, corpus):
+    entry = corpus[0]
+    old = scraping.extract_recipe(entry["url"])
+    assert scraping.extract_recipe(entry["url"], entry["html"]) is old
+
+    changed = entry["html"].replace("</body>", "<p>updated</p></body>")
+    new = scraping.extract_recipe(entry["url"], changed)
+    assert new is not old
+    assert new["page_hash"] == scraping.page_hash(changed)
+    assert scraping.extract_recipe(entry["url"]) is new
+
+
+def test_changed_page_gets_a_new_result(http, corpus):
+    entry, other = corpus[0], corpus[1]
+    first = recipe_logic.calculate_recipe(entry["url"], API_KEY)
+
+    # The same URL now serves another recipe
+    http.pages[entry["url"]] = other["html"]
+    scraping._EXTRACT_CACHE.clear()
+    recipe_logic._RECENT_RECIPES.clear()
+    second = recipe_logic.calculate_recipe(entry["url"], API_KEY)
+    assert [i.raw for i in second.ingredients] != [i.raw for i in first.ingredients]
+    assert second.title == scraping.scrape_recipe(other["url"])["title"]
+
+
+def test_abandoned_stream_releases_the_flight(http, corpus):
+    url = corpus[0]["url"]
+    events = recipe_logic.stream_recipe_calories(url, API_KEY)
+    next(events)
+    events.close()  # client went away
+    assert recipe_logic._RECIPE_FLIGHTS.stats()["in_flight"] == 0
+    assert recipe_logic.calculate_recipe(url, API_KEY).total_kcal is not None
+
+
+def test_slow_stream_reader_does_not_hold_up_waiters(http, corpus):
+    url = corpus[0]["url"]
+    events = recipe_logic.stream_recipe_calories(url, API_KEY)
+    next(events)  # the client reads one event, then stalls
+
+    waited = []
+    waiter = threading.Thread(target=lambda: waited.append(recipe_logic.calculate_recipe(url, API_KEY)), daemon=True)
+    waiter.start()
+    waiter.join(timeout=10)
+    assert waited, "calculate_recipe() waited on the stream's reader"
+    result = waited[0]
+    calls = http.usda_calls
+    rest = list(events)
+    assert http.usda_calls == calls
+    assert rest[-1]["total_kcal"] == result.total_kcal
+
+
+def test_disk_result_keeps_its_expiry(http, corpus, tmp_path, monkeypatch):
+    entry = corpus[0]
+    disk = DiskCache(str(tmp_path / "results.sqlite"), "results-test")
+    monkeypatch.setattr(recipe_logic, "_RESULT_DISK_CACHE", disk)
+    recipe_logic.calculate_recipe(entry["url"], API_KEY)
+
+    # Another worker finds the disk copy with a moment left to live
+    key = recipe_logic._result_cache_key(entry["url"], scraping.page_hash(entry["html"]))
+    stored = disk.get(key)
+    disk.set(key, {**stored, "expires": time.time() + 0.2})
+    recipe_logic._RESULT_CACHE.clear()
+    assert recipe_logic._get_cached_result(key) is not None
+    time.sleep(0.3)
+    assert recipe_logic._RESULT_CACHE.get(key) is None
@@ -0,0 +1,43 @@
+"""Result records and their wire format."""
+
+import json
+
+import pytest
+
+from api import records
+from api.records import IngredientResult, RecipeResult
+
+
+def _ingredient():
+    return IngredientResult("1 cup sugar", "sugar", ((1.0, "cup"),), 200.0, 387.0, 774.0,
+                            "Sugars, granulated", "ok", "")
+
+
+def _recipe():
+    return RecipeResult("Cake", 8, 774.0, 96.8, [_ingredient()])
+
+
+@pytest.mark.parametrize("record", [_ingredient(), _recipe()], ids=["ingredient", "recipe"])
+def test_to_wire_matches_wire_fields(record):
+    # to_wire() spells the fields out for speed; WIRE_FIELDS is the schema
+    assert tuple(record.to_wire()) == type(record).WIRE_FIELDS
+
+
+def test_from_wire_round_trip():
+    ingredient = _ingredient()
+    again = IngredientResult.from_wire(ingredient.to_wire())
+    assert again.to_wire() == ingredient.to_wire()
+    assert again.amounts == ()
+
+
+@pytest.mark.parametrize("engine", ["orjson", "stdlib"])
+def test_dumps_sends_wire_fields_only(engine, monkeypatch):
+    if engine == "stdlib":
+        monkeypatch.setattr(records, "orjson", None)
+    elif records.orjson is None:
+        pytest.skip("orjson not installed")
+    payload = json.loads(records.dumps({"recipe": _recipe()}))
+    ingredient = payload["recipe"]["ingredients"][0]
+    assert list(payload["recipe"]) == list(RecipeResult.WIRE_FIELDS)
+    assert list(ingredient) == list(IngredientResult.WIRE_FIELDS)
+    assert "amounts" not in ingredient